@@ -0,0 +1,98 @@
+import numpy as np
+
+# Byte value of the gap character
+GAP = ord("-")
+
+
+class Alignment:
+    """
+        Aligned sequences stored as one N x L uint8 matrix of byte codes with a list of names.
+    """
+    def __init__(self, names, rows):
+        """
+        Wraps an alignment matrix without copying it.
+
+        Args:
+            names (list): Sequence names, one per row.
+            rows (numpy.ndarray): N x L uint8 matrix of byte codes.
+        """
+        if len(names) != rows.shape[0]:
+            raise ValueError(f"Got {len(names)} names for {rows.shape[0]} rows")
+
+        self.names = list(names)
+        self.rows = rows
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Builds an alignment from (name, aligned_sequence) tuples of equal length.
+
+        Args:
+            records (list): (name, aligned_sequence) tuples; sequences may be strings, lists of
+                characters, bytes or uint8 arrays.
+
+        Returns:
+            Alignment: The packed alignment.
+        """
+        records = list(records)
+        names = [name for name, _ in records]
+        encoded = [_encode_row(sequence) for _, sequence in records]
+        if len({len(row) for row in encoded}) > 1:
+            raise ValueError("Aligned sequences differ in length")
+
+        rows = np.empty((len(encoded), len(encoded[0]) if encoded else 0), dtype=np.uint8)
+        for target, row in zip(rows, encoded):
+            target[:] = row
+        return cls(names, rows)
+
+    @property
+    def num_columns(self):
+        """
+        int: Number of alignment columns.
+        """
+        return self.rows.shape[1]
+
+    def row(self, index):
+        """
+        Gets one aligned sequence without copying it.
+
+        Returns:
+            memoryview: Read-only byte view of the row.
+        """
+        return memoryview(self.rows[index]).toreadonly()
+
+    def sequence(self, index):
+        """
+        Gets one aligned sequence as a string.
+
+        Returns:
+            str: Aligned sequence.
+        """
+        return self.rows[index].tobytes().decode("ascii")
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        """
+        Yields (name, aligned_sequence) tuples like the former list of alignments.
+        """
+        for index, name in enumerate(self.names):
+            yield name, self.sequence(index)
+
+    def __getitem__(self, index):
+        """
+        Gets the (name, aligned_sequence) tuple of one row.
+        """
+        return self.names[index], self.sequence(index)
+
+
+def _encode_row(sequence):
+    """
+    Encodes one aligned sequence as a uint8 array.
+    """
+    if isinstance(sequence, np.ndarray):
+        return sequence
+    if isinstance(sequence, (bytes, bytearray, memoryview)):
+        return np.frombuffer(sequence, dtype=np.uint8)
+    return np.frombuffer("".join(sequence).encode("ascii"), dtype=np.uint8)
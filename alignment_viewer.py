@@ -0,0 +1,257 @@
+import json
+import tkinter as tk
+from tkinter import font as tkfont
+from tkinter import ttk
+
+# Cell size of one residue in pixels
+CELL_WIDTH = 20
+ROW_HEIGHT = 22
+# Characters of the name shown in the ID column
+ID_WIDTH = 25
+ID_COLUMN_WIDTH = 210
+MAX_VISIBLE_ROWS = 15
+ID_FONT = ("Courier New", 10, "bold")
+ALIGN_FONT = ("Courier New", 12, "bold")
+# Font of alignments shown as plain text, without colored cells
+TEXT_FONT = ("Courier New", 10)
+BG_COLOR = "#f5f5f5"
+TEXT_COLOR = "#333333"
+
+
+def load_colors(path="colors.json"):
+    """
+    Reads the residue colors into a lookup table indexed by byte code.
+
+    Args:
+        path (str): JSON list of {"nucleotide": ..., "color": ...} entries.
+
+    Returns:
+        list: Fill color of every byte value in either case, "white" for residues
+              without a color.
+    """
+    with open(path, "r") as f:
+        color_data = json.load(f)
+
+    colors = ["white"] * 256
+    for item in color_data:
+        colors[ord(item["nucleotide"].upper())] = item["color"]
+        colors[ord(item["nucleotide"].lower())] = item["color"]
+    return colors
+
+
+def _scrolled(args, first, total, visible):
+    """
+    Applies a Scrollbar command ("moveto", fraction) or ("scroll", count, what) to the
+    first visible row or column.
+
+    Returns:
+        int: The new first row or column, clamped so the view stays filled.
+    """
+    if args[0] == "moveto":
+        first = int(round(float(args[1]) * total))
+    elif args[0] == "scroll":
+        first += int(args[1]) * (visible if args[2] == "pages" else 1)
+    return max(0, min(first, total - visible))
+
+
+def _fractions(first, visible, total):
+    if total == 0:
+        return 0.0, 1.0
+    return first / total, min(first + visible, total) / total
+
+
+def _wheel_step(event):
+    return -3 if event.num == 4 or event.delta > 0 else 3
+
+
+class AlignmentViewer(ttk.Frame):
+    """
+        Colored or plain-text, scrollable view of an alignment drawn on a single Canvas.
+
+        Only the cells inside the window are drawn, and they are redrawn on every scroll and
+        resize, so the cost depends on the window size rather than on the alignment size.
+    """
+    def __init__(self, master, alignment, colors=None, **kwargs):
+        """
+        Builds the ID column, the residue canvas and their scrollbars.
+
+        Args:
+            master: Parent widget.
+            alignment (Alignment): Alignment to show.
+            colors (list): Fill color per byte code, as returned by load_colors. None shows the
+                rows as plain text in TEXT_FONT.
+        """
+        super().__init__(master, **kwargs)
+        self.alignment = alignment
+        self.__colors = colors
+        self.__cell_width = CELL_WIDTH if colors is not None else tkfont.Font(font=TEXT_FONT).measure("0")
+        self.__first_row = 0
+        self.__first_column = 0
+        self.__redraw_pending = False
+
+        height = max(min(len(alignment), MAX_VISIBLE_ROWS), 1) * ROW_HEIGHT
+        self.__h_scroll = ttk.Scrollbar(self, orient="horizontal", command=self.xview)
+        self.__v_scroll = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.__id_canvas = tk.Canvas(self, width=ID_COLUMN_WIDTH, height=height, bg=BG_COLOR,
+                                     highlightthickness=0)
+        self.__canvas = tk.Canvas(self, height=height, bg="white", highlightthickness=0)
+
+        # Horizontal scrollbar on top, as in the other result tabs
+        self.__h_scroll.grid(row=0, column=1, sticky="ew")
+        self.__id_canvas.grid(row=1, column=0, sticky="ns")
+        self.__canvas.grid(row=1, column=1, sticky="nsew")
+        self.__v_scroll.grid(row=1, column=2, sticky="ns")
+        self.columnconfigure(1, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        self.__canvas.bind("<Configure>", lambda event: self.schedule_redraw())
+        for canvas in (self.__canvas, self.__id_canvas):
+            canvas.bind("<Enter>", lambda event, widget=canvas: widget.focus_set())
+            canvas.bind("<MouseWheel>", self._on_mousewheel)
+            canvas.bind("<Shift-MouseWheel>", self._on_mousewheel)
+            canvas.bind("<Button-4>", self._on_mousewheel)
+            canvas.bind("<Button-5>", self._on_mousewheel)
+
+    def _visible_rows(self):
+        return max(self.__canvas.winfo_height() // ROW_HEIGHT, 1)
+
+    def _visible_columns(self):
+        return max(self.__canvas.winfo_width() // self.__cell_width, 1)
+
+    def xview(self, *args):
+        """
+        Scrolls horizontally; called by the horizontal scrollbar.
+        """
+        self.__first_column = _scrolled(args, self.__first_column, self.alignment.num_columns,
+                                        self._visible_columns())
+        self.schedule_redraw()
+
+    def yview(self, *args):
+        """
+        Scrolls vertically; called by the vertical scrollbar. Moves the IDs with the rows.
+        """
+        self.__first_row = _scrolled(args, self.__first_row, len(self.alignment), self._visible_rows())
+        self.schedule_redraw()
+
+    def _on_mousewheel(self, event):
+        step = _wheel_step(event)
+        if event.state & 0x0001:
+            self.xview("scroll", step, "units")
+        else:
+            self.yview("scroll", step, "units")
+        # Keeps the handlers bound to the whole application from scrolling other tabs
+        return "break"
+
+    def schedule_redraw(self):
+        """
+        Redraws once the pending events are handled, so a burst of scroll events draws once.
+        """
+        if not self.__redraw_pending:
+            self.__redraw_pending = True
+            self.after_idle(self.redraw)
+
+    def redraw(self):
+        """
+        Draws the cells and IDs of the visible window and updates the scrollbars.
+        """
+        self.__redraw_pending = False
+        canvas, id_canvas = self.__canvas, self.__id_canvas
+        canvas.delete("all")
+        id_canvas.delete("all")
+
+        num_rows, num_columns = len(self.alignment), self.alignment.num_columns
+        # The last row and column may be partly visible
+        last_row = min(num_rows, self.__first_row + self._visible_rows() + 1)
+        last_column = min(num_columns, self.__first_column + self._visible_columns() + 1)
+
+        for index in range(self.__first_row, last_row):
+            y = (index - self.__first_row) * ROW_HEIGHT
+            id_canvas.create_text(4, y + ROW_HEIGHT / 2, text=self.alignment.names[index][:ID_WIDTH],
+                                  anchor="w", font=ID_FONT, fill=TEXT_COLOR)
+
+            codes = self.alignment.rows[index, self.__first_column:last_column].tobytes()
+            if self.__colors is None:
+                # One text item per row; the font is monospaced, so it lines up with the columns
+                canvas.create_text(0, y + ROW_HEIGHT / 2, text=codes.decode("latin-1"), anchor="w",
+                                   font=TEXT_FONT, fill=TEXT_COLOR)
+                continue
+            for offset, code in enumerate(codes):
+                x = offset * CELL_WIDTH
+                canvas.create_rectangle(x, y, x + CELL_WIDTH, y + ROW_HEIGHT, fill=self.__colors[code],
+                                        outline="black")
+                canvas.create_text(x + CELL_WIDTH / 2, y + ROW_HEIGHT / 2, text=chr(code), font=ALIGN_FONT,
+                                   fill="black")
+
+        self.__v_scroll.set(*_fractions(self.__first_row, self._visible_rows(), num_rows))
+        self.__h_scroll.set(*_fractions(self.__first_column, self._visible_columns(), num_columns))
+
+
+class LineViewer(ttk.Frame):
+    """
+        Vertically scrollable view of many lines of text drawn on a single Canvas.
+
+        The lines are produced on demand and only the visible ones are drawn, as in
+        AlignmentViewer.
+    """
+    def __init__(self, master, num_lines, line, visible_lines=MAX_VISIBLE_ROWS, **kwargs):
+        """
+        Builds the canvas and its scrollbar.
+
+        Args:
+            master: Parent widget.
+            num_lines (int): Number of lines.
+            line (callable): Returns (text, font, color) of the line at an index.
+            visible_lines (int): Lines shown before the window is resized.
+        """
+        super().__init__(master, **kwargs)
+        self.num_lines = num_lines
+        self.__line = line
+        self.__first_line = 0
+        self.__redraw_pending = False
+
+        self.__v_scroll = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.__canvas = tk.Canvas(self, height=max(min(num_lines, visible_lines), 1) * ROW_HEIGHT, bg="white",
+                                  highlightthickness=0)
+        self.__v_scroll.pack(side="right", fill="y")
+        self.__canvas.pack(side="left", fill="both", expand=True)
+
+        self.__canvas.bind("<Configure>", lambda event: self.schedule_redraw())
+        self.__canvas.bind("<Enter>", lambda event: self.__canvas.focus_set())
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.__canvas.bind(sequence, self._on_mousewheel)
+
+    def _visible_lines(self):
+        return max(self.__canvas.winfo_height() // ROW_HEIGHT, 1)
+
+    def yview(self, *args):
+        """
+        Scrolls vertically; called by the scrollbar.
+        """
+        self.__first_line = _scrolled(args, self.__first_line, self.num_lines, self._visible_lines())
+        self.schedule_redraw()
+
+    def _on_mousewheel(self, event):
+        self.yview("scroll", _wheel_step(event), "units")
+        return "break"
+
+    def schedule_redraw(self):
+        """
+        Redraws once the pending events are handled.
+        """
+        if not self.__redraw_pending:
+            self.__redraw_pending = True
+            self.after_idle(self.redraw)
+
+    def redraw(self):
+        """
+        Draws the visible lines and updates the scrollbar.
+        """
+        self.__redraw_pending = False
+        self.__canvas.delete("all")
+        last_line = min(self.num_lines, self.__first_line + self._visible_lines() + 1)
+        for index in range(self.__first_line, last_line):
+            text, font, color = self.__line(index)
+            y = (index - self.__first_line) * ROW_HEIGHT
+            self.__canvas.create_text(4, y + ROW_HEIGHT / 2, text=text, anchor="w", font=font, fill=color)
+
+        self.__v_scroll.set(*_fractions(self.__first_line, self._visible_lines(), self.num_lines))
@@ -0,0 +1,287 @@
+import gzip
+import os
+
+import numpy as np
+
+from column_profile import ColumnProfile
+
+# Residues per line of interleaved and wrapped output
+LINE_WIDTH = 60
+# Largest number of bytes assembled in memory before it is written
+CHUNK_BYTES = 1 << 20
+
+# Residue groups of the CLUSTAL conservation line: ":" if all residues of a column are in one
+# strong group, "." if they are in one weak group
+STRONG_GROUPS = ("STA", "NEQK", "NHQK", "NDEQ", "QHRK", "MILV", "MILF", "HY", "FYW")
+WEAK_GROUPS = ("CSA", "ATV", "SAG", "STNK", "STPA", "SGND", "SNDEQK", "NDEQHK", "NEQHRK", "FVLIM", "HFY")
+
+
+def _group_masks(groups):
+    """
+    Builds a bitmask per byte code of the groups containing that residue, in either case.
+    """
+    masks = np.zeros(256, dtype=np.uint32)
+    for bit, group in enumerate(groups):
+        for residue in group:
+            masks[ord(residue)] |= 1 << bit
+            masks[ord(residue.lower())] |= 1 << bit
+    return masks
+
+
+_STRONG_MASKS = _group_masks(STRONG_GROUPS)
+_WEAK_MASKS = _group_masks(WEAK_GROUPS)
+# Byte code to upper case, so that conserved columns ignore case
+_UPPER = np.frombuffer(bytes(range(256)).upper(), dtype=np.uint8)
+
+
+def conservation(block):
+    """
+    Computes the CLUSTAL conservation symbols of a block of columns from its column profile.
+
+    Args:
+        block (numpy.ndarray): n x c uint8 block of the alignment matrix.
+
+    Returns:
+        bytes: One of "*", ":", "." or " " per column. Columns with a gap are never conserved.
+    """
+    symbols = np.full(block.shape[1], ord(" "), dtype=np.uint8)
+    if not len(block):
+        return symbols.tobytes()
+
+    profile = ColumnProfile(_UPPER[block])
+    present = profile.residue_counts > 0
+    gapless = profile.gap_counts == 0
+
+    def in_one_group(masks):
+        # Groups shared by every residue present in the column
+        shared = np.where(present, masks[profile.residues], np.uint32(0xFFFFFFFF))
+        return np.bitwise_and.reduce(shared, axis=1) != 0
+
+    symbols[gapless & in_one_group(_WEAK_MASKS)] = ord(".")
+    symbols[gapless & in_one_group(_STRONG_MASKS)] = ord(":")
+    symbols[gapless & profile.conserved] = ord("*")
+    return symbols.tobytes()
+
+
+def _line_width(line_width, num_columns):
+    """
+    Resolves the line_width option of the writers: None or 0 means one unwrapped line or block.
+
+    Returns:
+        int: Residues per line or block, at least 1.
+
+    Raises:
+        ValueError: If line_width is negative.
+    """
+    if line_width is not None and line_width < 0:
+        raise ValueError(f"line_width must be positive, 0 or None, got {line_width}")
+    return line_width or max(num_columns, 1)
+
+
+def _labels(names, min_width=0, spacing=0):
+    """
+    Packs sequence identifiers into a matrix of left-aligned, space-padded byte rows.
+
+    Identifiers are the names up to the first whitespace, as CLUSTAL and Stockholm readers
+    split lines on whitespace.
+
+    Returns:
+        numpy.ndarray: N x width uint8 matrix.
+    """
+    identifiers = [(name.split() or [f"sequence{index + 1}"])[0].encode("utf-8")
+                   for index, name in enumerate(names)]
+    width = max([min_width] + [len(identifier) for identifier in identifiers]) + spacing
+    labels = np.full((len(identifiers), width), ord(" "), dtype=np.uint8)
+    for label, identifier in zip(labels, identifiers):
+        label[:len(identifier)] = np.frombuffer(identifier, dtype=np.uint8)
+    return labels
+
+
+def _write_lines(file, labels, rows, start, stop):
+    """
+    Writes label + rows[:, start:stop] + newline for every row.
+
+    Several lines are assembled at once with NumPy, up to CHUNK_BYTES, and lines longer than
+    that are written in slices, so memory stays flat however large the alignment is.
+    """
+    width = stop - start
+    group = max(1, CHUNK_BYTES // max(width + labels.shape[1] + 1, 1))
+    newlines = np.full((min(group, len(rows)), 1), ord("\n"), dtype=np.uint8)
+    for first in range(0, len(rows), group):
+        last = min(first + group, len(rows))
+        if width <= CHUNK_BYTES:
+            lines = np.concatenate((labels[first:last], rows[first:last, start:stop],
+                                    newlines[:last - first]), axis=1)
+            file.write(lines.tobytes())
+        else:
+            file.write(labels[first].tobytes())
+            for offset in range(start, stop, CHUNK_BYTES):
+                file.write(rows[first, offset:min(offset + CHUNK_BYTES, stop)].tobytes())
+            file.write(b"\n")
+
+
+def write_clustal(file, alignment, line_width=LINE_WIDTH):
+    """
+    Writes an alignment in interleaved CLUSTAL format with a conservation line under every
+    block.
+
+    Args:
+        file: Binary file object.
+        alignment (Alignment): Alignment to write.
+        line_width (int): Residues per block, None or 0 for a single block.
+    """
+    line_width = _line_width(line_width, alignment.num_columns)
+    labels = _labels(alignment.names, spacing=6)
+    # Conservation is computed in slices of about CHUNK_BYTES cells, however wide the block is
+    step = max(CHUNK_BYTES // max(len(alignment), 1), 1)
+    file.write(b"CLUSTAL multiple sequence alignment\n\n")
+    for start in range(0, alignment.num_columns, line_width):
+        stop = min(start + line_width, alignment.num_columns)
+        file.write(b"\n")
+        _write_lines(file, labels, alignment.rows, start, stop)
+        file.write(b" " * labels.shape[1])
+        for offset in range(start, stop, step):
+            file.write(conservation(alignment.rows[:, offset:min(offset + step, stop)]))
+        file.write(b"\n")
+
+
+def write_fasta(file, alignment, line_width=LINE_WIDTH):
+    """
+    Writes an alignment in FASTA format with the sequences wrapped.
+
+    Args:
+        file: Binary file object.
+        alignment (Alignment): Alignment to write.
+        line_width (int): Residues per line, None or 0 for one line per sequence.
+    """
+    num_columns = alignment.num_columns
+    # Lines too long to assemble are written as slices of the row, without copying it
+    sliced = not line_width or line_width > CHUNK_BYTES
+    line_width = _line_width(line_width, num_columns)
+    # Whole lines per chunk, so only the last line of a sequence can be short
+    chunk_columns = max(line_width, CHUNK_BYTES // line_width * line_width)
+    for index, name in enumerate(alignment.names):
+        file.write(b">" + name.encode("utf-8") + b"\n")
+        if sliced:
+            row = alignment.row(index)
+            for start in range(0, num_columns, line_width):
+                stop = min(start + line_width, num_columns)
+                for offset in range(start, stop, CHUNK_BYTES):
+                    file.write(row[offset:min(offset + CHUNK_BYTES, stop)])
+                file.write(b"\n")
+            continue
+
+        row = alignment.rows[index]
+        for start in range(0, num_columns, chunk_columns):
+            chunk = row[start:min(start + chunk_columns, num_columns)]
+            full = len(chunk) // line_width * line_width
+            if full:
+                lines = chunk[:full].reshape(-1, line_width)
+                newlines = np.full((len(lines), 1), ord("\n"), dtype=np.uint8)
+                file.write(np.concatenate((lines, newlines), axis=1).tobytes())
+            if full < len(chunk):
+                file.write(chunk[full:].tobytes() + b"\n")
+
+
+def write_stockholm(file, alignment, line_width=None, annotations=None):
+    """
+    Writes an alignment in Stockholm format, with the consensus of every block as a
+    "#=GC seq_cons" line.
+
+    Args:
+        file: Binary file object.
+        alignment (Alignment): Alignment to write.
+        line_width (int): Residues per block, None or 0 for a single block.
+        annotations (dict): Per-file annotations written as "#=GF <feature> <text>" lines,
+            e.g. {"DE": "...", "CC": "..."}. Multi-line texts give one line per text line.
+    """
+    labels = _labels(alignment.names, spacing=1)
+    file.write(b"# STOCKHOLM 1.0\n")
+    for feature, text in (annotations or {}).items():
+        for line in str(text).splitlines():
+            file.write(f"#=GF {feature} {line}\n".encode("utf-8"))
+
+    # The consensus line is labelled like the sequences, so the label column may need to widen
+    consensus_label = b"#=GC seq_cons"
+    if labels.shape[1] < len(consensus_label) + 1:
+        labels = _labels(alignment.names, min_width=len(consensus_label), spacing=1)
+    consensus_label = consensus_label.ljust(labels.shape[1])
+
+    line_width = _line_width(line_width, alignment.num_columns)
+    for start in range(0, alignment.num_columns, line_width):
+        stop = min(start + line_width, alignment.num_columns)
+        file.write(b"\n")
+        _write_lines(file, labels, alignment.rows, start, stop)
+        if len(alignment):
+            file.write(consensus_label)
+            # Profiled in slices of about CHUNK_BYTES cells, however wide the block is
+            step = max(CHUNK_BYTES // len(alignment), 1)
+            for offset in range(start, stop, step):
+                file.write(ColumnProfile(alignment.rows[:, offset:min(offset + step, stop)]).consensus.encode("ascii"))
+            file.write(b"\n")
+    file.write(b"//\n")
+
+
+# Writers by format name, with the suffix of the files they write
+WRITERS = {
+    "clustal": (write_clustal, ".aln"),
+    "fasta": (write_fasta, ".aligned.fasta"),
+    "stockholm": (write_stockholm, ".sto"),
+}
+
+
+def register_writer(name, writer, suffix):
+    """
+    Adds an output format.
+
+    Args:
+        name (str): Format name used by write_alignment and the command line.
+        writer (callable): writer(file, alignment, **options) writing to a binary file.
+        suffix (str): Suffix of the files it writes.
+    """
+    WRITERS[name] = (writer, suffix)
+
+
+def open_output(path, compress=None):
+    """
+    Opens a file for binary writing.
+
+    Args:
+        path (str): Output path.
+        compress (bool): Whether to gzip the output. None compresses paths ending in ".gz".
+
+    Returns:
+        file: Binary file object.
+    """
+    if compress is None:
+        compress = path.endswith(".gz")
+    if compress:
+        return gzip.open(path, "wb", compresslevel=6)
+    return open(path, "wb")
+
+
+def write_alignment(path, alignment, format_name, compress=None, **options):
+    """
+    Writes an alignment to a file in one of the registered formats.
+
+    Args:
+        path (str): Output path.
+        alignment (Alignment): Alignment to write.
+        format_name (str): Key of WRITERS.
+        compress (bool): Whether to gzip the output. None compresses paths ending in ".gz".
+        **options: Passed on to the writer, e.g. line_width.
+    """
+    if format_name not in WRITERS:
+        raise ValueError(f"Unknown format {format_name!r}, expected one of {sorted(WRITERS)}")
+    # Checked before anything is written
+    _line_width(options.get("line_width"), alignment.num_columns)
+
+    writer, _ = WRITERS[format_name]
+    try:
+        with open_output(path, compress) as file:
+            writer(file, alignment, **options)
+    except BaseException:
+        # A partial file would look like a finished alignment
+        if os.path.exists(path):
+            os.remove(path)
+        raise
@@ -0,0 +1,115 @@
+import numpy as np
+
+from pairwise_alignment import encode_sequence, pair_score
+
+# Default k-mer length and number of center candidates rescored exactly
+KMER_SIZE = 3
+CENTER_CANDIDATES = 8
+
+
+def kmer_distance_sums(sequences, k=KMER_SIZE):
+    """
+    Computes, for every sequence, the sum of squared k-mer profile distances to all others.
+
+    With c_a the k-mer count vector of sequence a and S the sum of all count vectors,
+    sum_b |c_a - c_b|^2 = N |c_a|^2 + sum_b |c_b|^2 - 2 c_a . S, so the sums only need
+    one pass over the k-mers of every sequence and no N x N distance matrix.
+
+    Args:
+        sequences (list): Sequence strings.
+        k (int): k-mer length.
+
+    Returns:
+        numpy.ndarray: Distance sum of every sequence, smaller is more central.
+    """
+    encoded = [encode_sequence(sequence) for sequence in sequences]
+    num_sequences = len(encoded)
+    alphabet, codes = np.unique(np.concatenate(encoded + [np.empty(0, dtype=np.uint8)]), return_inverse=True)
+    powers = len(alphabet) ** np.arange(k - 1, -1, -1, dtype=np.int64)
+
+    # Integer k-mer codes of all sequences, tagged with the sequence they come from
+    kmers = []
+    owners = []
+    start = 0
+    for index, sequence in enumerate(encoded):
+        residues = codes[start:start + len(sequence)].astype(np.int64)
+        start += len(sequence)
+        if len(residues) >= k:
+            windows = np.lib.stride_tricks.sliding_window_view(residues, k)
+            kmers.append(windows @ powers)
+            owners.append(np.full(len(windows), index, dtype=np.int64))
+    if not kmers:
+        return np.zeros(num_sequences, dtype=np.int64)
+
+    kmer_ids, kmer_index = np.unique(np.concatenate(kmers), return_inverse=True)
+    owners = np.concatenate(owners)
+
+    # Sparse (sequence, k-mer) -> count table
+    cells, counts = np.unique(owners * len(kmer_ids) + kmer_index, return_counts=True)
+    cell_owner, cell_kmer = np.divmod(cells, len(kmer_ids))
+    totals = np.bincount(cell_kmer, weights=counts, minlength=len(kmer_ids)).astype(np.int64)
+
+    squared_norms = np.bincount(cell_owner, weights=counts * counts, minlength=num_sequences).astype(np.int64)
+    shared = np.bincount(cell_owner, weights=counts * totals[cell_kmer], minlength=num_sequences).astype(np.int64)
+
+    return num_sequences * squared_norms + squared_norms.sum() - 2 * shared
+
+
+def shortlist_centers(sequences, count=CENTER_CANDIDATES, k=KMER_SIZE):
+    """
+    Picks the sequences with the smallest k-mer distance sums as center candidates.
+
+    Args:
+        sequences (list): Sequence strings.
+        count (int): Number of candidates.
+        k (int): k-mer length.
+
+    Returns:
+        list: Candidate indices in ascending order.
+    """
+    distances = kmer_distance_sums(sequences, k)
+    return sorted(np.argsort(distances, kind="stable")[:count].tolist())
+
+
+def compare_center_methods(sequence_sets, substitution, gap_penalty, count=CENTER_CANDIDATES,
+                           k=KMER_SIZE, band=None):
+    """
+    Checks whether the k-mer shortlist finds the same center as exact all-pairs scoring.
+
+    Args:
+        sequence_sets (dict): Set name -> list of (name, sequence) tuples.
+        substitution (SubstitutionMatrix): Pair scores of the residues.
+        gap_penalty (int): Penalty for a gap.
+        count (int): Number of candidates rescored exactly.
+        k (int): k-mer length.
+        band (int): Largest band half-width for banded scoring, None for the full DP.
+
+    Returns:
+        list: One dict per set with the exact and approximate centers, their score sums and
+              whether they match.
+    """
+    report = []
+    for set_name, records in sequence_sets.items():
+        sequences = [sequence for _, sequence in records]
+        num_sequences = len(sequences)
+        scores = np.zeros((num_sequences, num_sequences), dtype=np.int64)
+        for i in range(num_sequences):
+            for j in range(i + 1, num_sequences):
+                scores[i, j] = scores[j, i] = pair_score(sequences[i], sequences[j], substitution,
+                                                         gap_penalty, band)
+        sums = scores.sum(axis=1)
+        candidates = shortlist_centers(sequences, count, k)
+        exact_center = int(np.argmax(sums))
+        approximate_center = candidates[int(np.argmax(sums[candidates]))]
+
+        report.append({
+            "set": set_name,
+            "sequences": num_sequences,
+            "exact_center": records[exact_center][0],
+            "approximate_center": records[approximate_center][0],
+            "exact_score": int(sums[exact_center]),
+            "approximate_score": int(sums[approximate_center]),
+            "match": exact_center == approximate_center,
+        })
+
+    return report
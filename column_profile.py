@@ -0,0 +1,131 @@
+import numpy as np
+
+from alignment import GAP
+
+# Largest number of cells counted at once, bounding the temporary index arrays
+CHUNK_CELLS = 1 << 20
+
+
+def _column_blocks(num_rows, num_columns):
+    """
+    Splits the columns into blocks of at most CHUNK_CELLS cells.
+
+    Yields:
+        tuple: (start, stop) column range of every block.
+    """
+    width = max(CHUNK_CELLS // max(num_rows, 1), 1)
+    for start in range(0, num_columns, width):
+        yield start, min(start + width, num_columns)
+
+
+class ColumnProfile:
+    """
+        Per-column symbol counts of a finished alignment and the measures derived from them.
+    """
+    def __init__(self, rows):
+        """
+        Counts every symbol in every column with a bincount per block of columns, without
+        sorting. The byte values present are found first, so the table only has a column per
+        symbol that occurs.
+
+        Args:
+            rows (numpy.ndarray): N x L uint8 alignment matrix, e.g. Alignment.rows.
+        """
+        num_rows, num_columns = rows.shape
+        histogram = np.zeros(256, dtype=np.int64)
+        for start, stop in _column_blocks(num_rows, num_columns):
+            histogram += np.bincount(rows[:, start:stop].ravel(), minlength=256)
+        symbols = np.flatnonzero(histogram).astype(np.uint8)
+        # Byte value -> position among the symbols present
+        positions = np.zeros(256, dtype=np.int64)
+        positions[symbols] = np.arange(len(symbols))
+
+        counts = np.zeros((num_columns, len(symbols)), dtype=np.int64)
+        for start, stop in _column_blocks(num_rows, num_columns):
+            width = stop - start
+            cells = positions[rows[:, start:stop]] + np.arange(width) * len(symbols)
+            counts[start:stop] = np.bincount(cells.ravel(), minlength=width * len(symbols)).reshape(
+                width, len(symbols))
+
+        self.num_rows = num_rows
+        self.num_columns = num_columns
+        # Residue symbols and their L x len(residues) count table
+        self.residues = symbols[symbols != GAP]
+        self.residue_counts = counts[:, symbols != GAP]
+        self.gap_counts = num_rows - self.residue_counts.sum(axis=1)
+        # A column is conserved when every row holds the same symbol
+        self.conserved = counts.max(axis=1, initial=0) == num_rows
+
+    @property
+    def consensus(self):
+        """
+        str: Most frequent residue of every column, "-" for columns with gaps only.
+        Ties go to the smallest character code.
+        """
+        if not len(self.residues):
+            return "-" * self.num_columns
+
+        consensus = self.residues[np.argmax(self.residue_counts, axis=1)]
+        consensus[self.gap_counts == self.num_rows] = GAP
+        return consensus.tobytes().decode("ascii")
+
+    @property
+    def identity(self):
+        """
+        numpy.ndarray: Share of the rows holding the consensus residue in every column.
+        """
+        return self.residue_counts.max(axis=1, initial=0) / self.num_rows
+
+    @property
+    def entropy(self):
+        """
+        numpy.ndarray: Shannon entropy in bits of the residue distribution of every column,
+        ignoring gaps. Columns with gaps only have zero entropy.
+        """
+        residues = self.num_rows - self.gap_counts
+        frequencies = self.residue_counts / np.maximum(residues, 1)[:, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            terms = np.where(frequencies > 0, -frequencies * np.log2(frequencies), 0.0)
+        return terms.sum(axis=1)
+
+    def statistics(self):
+        """
+        Counts conserved columns, columns with gaps and mismatch columns.
+
+        Returns:
+            dict: match, mismatch, gap and identity_percent.
+        """
+        num_match = int(self.conserved.sum())
+        num_gap = int((~self.conserved & (self.gap_counts > 0)).sum())
+        num_mismatch = self.num_columns - num_match - num_gap
+        identity_percent = (num_match / self.num_columns) * 100
+
+        return {
+            "match": num_match,
+            "mismatch": num_mismatch,
+            "gap": num_gap,
+            "identity_percent": round(identity_percent, 2)
+        }
+
+    def sum_of_pairs(self, match, substitution, gap):
+        """
+        Computes the sum-of-pairs score of the alignment.
+
+        Every column contributes match pairs C(count, 2) for each residue, gap-residue pairs
+        gap_count * residue_count and substitutions for the remaining residue pairs. Pairs of
+        two gaps score zero.
+
+        Args:
+            match (int): Score of two equal residues.
+            substitution (int): Score of two different residues.
+            gap (int): Score of a residue against a gap.
+
+        Returns:
+            int: Total alignment score.
+        """
+        residues = self.num_rows - self.gap_counts
+        matches = int((self.residue_counts * (self.residue_counts - 1) // 2).sum())
+        residue_pairs = int((residues * (residues - 1) // 2).sum())
+        gap_pairs = int((self.gap_counts * residues).sum())
+
+        return matches * match + (residue_pairs - matches) * substitution + gap_pairs * gap
@@ -0,0 +1,333 @@
+import io
+import mmap
+import os
+
+# Residues accepted by default, in either case
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+
+# Suffix of the index files written by FastaIndex, kept apart from samtools' .fai
+INDEX_SUFFIX = ".msa.fai"
+# First line of every index written by FastaIndex; files without it are never overwritten
+INDEX_MARKER = "#msa-fasta-index\t1"
+
+
+class FastaError(ValueError):
+    """
+        A FASTA record that cannot be used, with its name and the line it starts on.
+    """
+    def __init__(self, message, name, line):
+        super().__init__(message)
+        self.name = name
+        self.line = line
+
+
+def _lines(source):
+    """
+    Yields the raw byte lines of a path, file object, bytes or mmap without reading it whole.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            yield from file
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield from io.BytesIO(source)
+    elif isinstance(source, mmap.mmap):
+        yield from iter(source.readline, b"")
+    else:
+        for line in source:
+            yield line.encode("utf-8") if isinstance(line, str) else line
+
+
+def read_fasta(source, alphabet=AMINO_ACIDS, invalid=None):
+    """
+    Parses FASTA records one at a time, in file order and keeping duplicate names.
+
+    Every record is validated with a single bytes.translate call that deletes the allowed
+    residues; anything left over is invalid.
+
+    Args:
+        source: Path of a FASTA file, binary or text file object, bytes or mmap.
+        alphabet (str): Allowed residues, accepted in upper and lower case. None accepts
+            any sequence.
+        invalid (list): If given, invalid records are appended to it as FastaError and parsing
+            continues with the next record. Otherwise the first invalid record raises.
+
+    Yields:
+        tuple: (name, sequence) of every valid record.
+
+    Raises:
+        FastaError: For the first invalid record when invalid is None.
+    """
+    allowed = None if alphabet is None else (alphabet.upper() + alphabet.lower()).encode("ascii")
+    name = None
+    start = 0
+    chunks = []
+    # Set once sequence data without a header has been reported
+    headerless = False
+
+    def finish():
+        sequence = b"".join(chunks)
+        leftover = b"" if allowed is None else sequence.translate(None, allowed)
+        if not leftover:
+            return name, sequence.decode("latin-1")
+
+        error = FastaError(f"The sequence {name} (line {start}) contains invalid character "
+                           f"{chr(leftover[0])!r}", name, start)
+        if invalid is None:
+            raise error
+        invalid.append(error)
+        return None
+
+    for number, line in enumerate(_lines(source), 1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(b">"):
+            if name is not None:
+                record = finish()
+                if record is not None:
+                    yield record
+            name = line[1:].strip().decode("utf-8", errors="replace")
+            start = number
+            chunks = []
+        elif name is None:
+            if not headerless:
+                error = FastaError(f"Sequence data before the first header on line {number}", None, number)
+                if invalid is None:
+                    raise error
+                invalid.append(error)
+                headerless = True
+        else:
+            chunks.append(line)
+
+    if name is not None:
+        record = finish()
+        if record is not None:
+            yield record
+
+
+class FastaIndex:
+    """
+        Random access to the records of a FASTA file through a .fai-style index and an mmap.
+    """
+    def __init__(self, path, index_path=None):
+        """
+        Loads the index of a FASTA file, building it first if it is missing or stale.
+
+        The index lives next to the file as path + INDEX_SUFFIX. After the INDEX_MARKER line it
+        holds one line per record with the columns NAME, LENGTH, OFFSET, LINEBASES and LINEWIDTH
+        as in samtools, but NAME is the whole header line, as in read_fasta, so the file is not a
+        samtools index and does not use its name. Duplicate names are kept. The index is given
+        the mtime of the FASTA file and rebuilt whenever the two differ. A file at index_path
+        without the marker is left untouched and the index is only kept in memory. Records whose
+        lines are not all of equal length are indexed as a single line spanning the whole record.
+
+        Args:
+            path (str): Path of the FASTA file.
+            index_path (str): Path of the index. Defaults to path + INDEX_SUFFIX.
+        """
+        self.path = path
+        self.index_path = index_path or path + INDEX_SUFFIX
+        self.__memory = None
+        self.__file = None
+
+        mtime = os.stat(path).st_mtime_ns
+        entries = None
+        if os.path.exists(self.index_path) and os.stat(self.index_path).st_mtime_ns == mtime:
+            entries = self._read_index()
+        if entries is None:
+            entries = self._build_index()
+            try:
+                self._write_index(entries, mtime)
+            except OSError:
+                # A read-only location only costs a rebuild next time
+                pass
+
+        self.names = [entry[0] for entry in entries]
+        self.__entries = entries
+        self.__positions = {}
+        for position, name in enumerate(self.names):
+            self.__positions.setdefault(name, position)
+
+    def _build_index(self):
+        """
+        Scans the file once and records where every sequence starts and how it is wrapped.
+
+        Returns:
+            list: (name, length, offset, line_bases, line_width) per record.
+        """
+        entries = []
+        record = None
+        offset = 0
+        with open(self.path, "rb") as file:
+            for line in file:
+                if line.startswith(b">"):
+                    if record is not None:
+                        entries.append(self._finish_entry(*record))
+                    name = line[1:].strip().decode("utf-8", errors="replace")
+                    record = [name, offset + len(line), []]
+                elif record is not None:
+                    record[2].append(line)
+                offset += len(line)
+
+        if record is not None:
+            entries.append(self._finish_entry(*record))
+        return entries
+
+    @staticmethod
+    def _finish_entry(name, offset, lines):
+        """
+        Builds the index entry of one record from its raw sequence lines.
+        """
+        # Trailing blank lines are not part of the sequence
+        while lines and not lines[-1].strip():
+            lines.pop()
+        bases = [len(line.strip()) for line in lines]
+        length = sum(bases)
+        if not lines:
+            return name, 0, offset, 0, 0
+
+        widths = [len(line) for line in lines]
+        # Every line but the last holds the same number of bases and ends the same way
+        regular = (len(set(bases[:-1])) <= 1 and len(set(widths[:-1])) <= 1 and 0 < bases[-1] <= bases[0]
+                   and all(len(line.rstrip(b"\r\n")) == count for line, count in zip(lines, bases)))
+        if regular:
+            return name, length, offset, bases[0], widths[0]
+
+        return name, length, offset, length, sum(widths)
+
+    def _is_own_index(self):
+        """
+        Tells whether the file at index_path was written by FastaIndex.
+        """
+        try:
+            with open(self.index_path, encoding="utf-8", errors="replace") as file:
+                return file.readline().rstrip("\n") == INDEX_MARKER
+        except OSError:
+            return False
+
+    def _read_index(self):
+        """
+        Reads the entries of an index written by FastaIndex.
+
+        Returns:
+            list: The entries, or None if the file is not such an index.
+        """
+        if not self._is_own_index():
+            return None
+        entries = []
+        with open(self.index_path, encoding="utf-8") as file:
+            next(file)
+            for line in file:
+                name, length, offset, line_bases, line_width = line.rstrip("\n").rsplit("\t", 4)
+                entries.append((name, int(length), int(offset), int(line_bases), int(line_width)))
+        return entries
+
+    def _write_index(self, entries, mtime):
+        if os.path.exists(self.index_path) and not self._is_own_index():
+            return
+        with open(self.index_path, "w", encoding="utf-8") as file:
+            file.write(INDEX_MARKER + "\n")
+            for entry in entries:
+                file.write("\t".join(str(value) for value in entry) + "\n")
+        os.utime(self.index_path, ns=(mtime, mtime))
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __getitem__(self, key):
+        """
+        Gets one record by position or by name.
+
+        Returns:
+            tuple: (name, sequence)
+        """
+        position = self.position(key)
+        return self.names[position], self.fetch(position)
+
+    def position(self, key):
+        """
+        Resolves a record name (its first occurrence) or position to a position.
+
+        Returns:
+            int: Position of the record in the file.
+        """
+        if isinstance(key, str):
+            if key not in self.__positions:
+                raise KeyError(f"No sequence named {key!r} in {self.path}")
+            return self.__positions[key]
+        if not -len(self) <= key < len(self):
+            raise IndexError(f"Sequence index {key} out of range")
+        return key % len(self)
+
+    def fetch(self, key, alphabet=None):
+        """
+        Reads one sequence from the memory-mapped file.
+
+        Args:
+            key (int or str): Position or name of the record.
+            alphabet (str): Allowed residues, accepted in upper and lower case, checked as in
+                read_fasta. None accepts any sequence.
+
+        Returns:
+            str: The sequence without line breaks.
+
+        Raises:
+            FastaError: If the sequence contains a residue outside alphabet.
+        """
+        position = self.position(key)
+        _, length, offset, line_bases, line_width = self.__entries[position]
+        if length == 0:
+            return ""
+
+        full_lines, rest = divmod(length, line_bases)
+        span = full_lines * line_width + rest
+        sequence = self._memory()[offset:offset + span].translate(None, b" \t\r\n")
+        if alphabet is not None:
+            leftover = sequence.translate(None, (alphabet.upper() + alphabet.lower()).encode("ascii"))
+            if leftover:
+                name = self.names[position]
+                raise FastaError(f"The sequence {name} contains invalid character {chr(leftover[0])!r}",
+                                 name, None)
+        return sequence.decode("latin-1")
+
+    def select(self, keys, alphabet=None):
+        """
+        Reads only the requested records.
+
+        Args:
+            keys (list): Positions or names.
+            alphabet (str): Allowed residues, as in fetch.
+
+        Returns:
+            list: (name, sequence) tuples in the order of keys.
+        """
+        return [(self.names[self.position(key)], self.fetch(key, alphabet)) for key in keys]
+
+    def records(self):
+        """
+        Yields every record in file order, reading one sequence at a time.
+        """
+        for position in range(len(self)):
+            yield self[position]
+
+    def _memory(self):
+        if self.__memory is None:
+            self.__file = open(self.path, "rb")
+            self.__memory = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.__memory
+
+    def close(self):
+        """
+        Unmaps the file.
+        """
+        if self.__memory is not None:
+            self.__memory.close()
+            self.__file.close()
+            self.__memory = None
+            self.__file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,260 @@
+import argparse
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from alignment_writers import WRITERS, write_alignment
+from fasta_io import AMINO_ACIDS, INDEX_SUFFIX, FastaIndex, read_fasta
+from multiple_sequence_aligner import ENGINES, MultipleSequenceAligner
+from result_format import RESULT_SUFFIX, AlignmentResult
+
+# Options recorded with every alignment
+PARAMETERS = ("match_score", "mismatch_score", "gap_penalty", "match", "substitution", "gap", "matrix")
+
+# Extensions of the files picked up from input directories
+FASTA_EXTENSIONS = (".fasta", ".fa", ".faa", ".fas")
+
+
+def find_inputs(patterns):
+    """
+    Expands files, directories and glob patterns into FASTA file paths.
+
+    Args:
+        patterns (list): Paths of files or directories, or glob patterns.
+
+    Returns:
+        tuple: (paths, missing) - the FASTA files in order without duplicates, and the patterns
+               that matched nothing.
+    """
+    paths = []
+    missing = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        found = []
+        for match in matches:
+            if os.path.isdir(match):
+                found.extend(sorted(os.path.join(match, name) for name in os.listdir(match)
+                                    if name.lower().endswith(FASTA_EXTENSIONS)))
+            elif os.path.isfile(match):
+                found.append(match)
+        if not found:
+            missing.append(pattern)
+        paths.extend(path for path in found if path not in paths)
+
+    return paths, missing
+
+
+def output_stems(paths, output_dir):
+    """
+    Chooses the output path prefix of every input.
+
+    Outputs go next to their input, or into output_dir named after the input file. When two
+    inputs from different directories share a file name, the outputs in output_dir keep the
+    input directories relative to their common parent so they do not overwrite each other.
+
+    Args:
+        paths (list): Input FASTA files.
+        output_dir (str): Directory for the outputs, or None to write next to each input.
+
+    Returns:
+        tuple: (stems, conflicts) - the prefix per input path, and the inputs whose outputs would
+               still collide (e.g. x.fa and x.fasta in one directory), grouped by prefix.
+    """
+    def stem_of(path, directory):
+        return os.path.normpath(os.path.join(directory, os.path.splitext(os.path.basename(path))[0]))
+
+    if output_dir:
+        stems = {path: stem_of(path, output_dir) for path in paths}
+        if len(set(stems.values())) < len(stems):
+            parent = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+            stems = {path: stem_of(path, os.path.join(output_dir, os.path.relpath(
+                os.path.dirname(os.path.abspath(path)), parent))) for path in paths}
+    else:
+        stems = {path: stem_of(path, os.path.dirname(path)) for path in paths}
+
+    by_stem = {}
+    for path, stem in stems.items():
+        by_stem.setdefault(os.path.normcase(os.path.abspath(stem)), []).append(path)
+    conflicts = [group for group in by_stem.values() if len(group) > 1]
+    return stems, conflicts
+
+
+def align_file(path, options, stem=None):
+    """
+    Aligns the records of one FASTA file and writes the requested outputs and statistics.
+
+    Args:
+        path (str): Input FASTA file.
+        options (dict): Scoring parameters, aligner settings and output options.
+        stem (str): Path prefix of the outputs, as chosen by output_stems. Defaults to the input
+            file name in the output directory or next to the input.
+
+    Returns:
+        dict: Summary written to the statistics JSON.
+    """
+    if options["select"]:
+        # Only the selected records are read, through the index instead of parsing the whole file
+        with FastaIndex(path) as index:
+            sequences = index.select(options["select"], alphabet=options["alphabet"])
+    else:
+        sequences = list(read_fasta(path, alphabet=options["alphabet"]))
+    if len(sequences) < 2:
+        raise ValueError(f"{path} contains {len(sequences)} sequence(s), at least 2 are needed")
+
+    msa = MultipleSequenceAligner(sequences, options["match_score"], options["mismatch_score"],
+                                  options["gap_penalty"], options["match"], options["substitution"],
+                                  options["gap"], engine=options["engine"], workers=options["pair_workers"],
+                                  band=options["band"], substitution_matrix=options["matrix"],
+                                  time_limit=options["time_limit"])
+    final_alignments = msa.get_final_alignments()
+
+    if stem is None:
+        stem = os.path.join(options["output_dir"] or os.path.dirname(path),
+                            os.path.splitext(os.path.basename(path))[0])
+    if os.path.dirname(stem):
+        os.makedirs(os.path.dirname(stem), exist_ok=True)
+    writer_options = {} if options["line_width"] is None else {"line_width": options["line_width"]}
+    outputs = {}
+    for name in options["formats"]:
+        output = stem + WRITERS[name][1] + (".gz" if options["gzip"] else "")
+        write_alignment(output, final_alignments, name, compress=options["gzip"], **writer_options)
+        outputs[name] = output
+    if options["save_result"]:
+        AlignmentResult.from_aligner(msa, {key: options[key] for key in PARAMETERS}).save(stem + RESULT_SUFFIX)
+        outputs["result"] = stem + RESULT_SUFFIX
+
+    summary = {
+        "input": path,
+        "sequences": len(sequences),
+        "columns": final_alignments.num_columns,
+        "center": msa.get_central_sequence()[0],
+        "score": msa.get_score(),
+        "statistics": msa.get_statistics(),
+        "parameters": {key: options[key] for key in PARAMETERS},
+        "outputs": outputs,
+    }
+    with open(stem + ".stats.json", "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=2)
+
+    return summary
+
+
+def _run(job):
+    """
+    Pool task: aligns one file and turns a failure into an error message.
+
+    Returns:
+        tuple: (path, summary, error) with exactly one of summary and error set.
+    """
+    path, stem, options = job
+    try:
+        return path, align_file(path, options, stem), None
+    except Exception as error:
+        return path, None, f"{type(error).__name__}: {error}"
+
+
+def _non_negative(text):
+    """
+    argparse type of --line-width: an integer that is not negative.
+    """
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or positive, got {value}")
+    return value
+
+
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(
+        description="Center star multiple sequence alignment of FASTA files, one alignment per file.")
+    parser.add_argument("inputs", nargs="+", help="FASTA files, directories of FASTA files or glob patterns")
+    parser.add_argument("--match-score", type=int, default=1, help="pairwise score for a match (default 1)")
+    parser.add_argument("--mismatch-score", type=int, default=-1, help="pairwise score for a mismatch (default -1)")
+    parser.add_argument("--gap-penalty", type=int, default=-2, help="pairwise gap penalty (default -2)")
+    parser.add_argument("--match", type=int, default=1, help="final scoring weight of a match (default 1)")
+    parser.add_argument("--substitution", type=int, default=-1,
+                        help="final scoring weight of a substitution (default -1)")
+    parser.add_argument("--gap", type=int, default=-2, help="final scoring weight of a gap (default -2)")
+    parser.add_argument("--matrix", help="substitution matrix for the pairwise DP: BLOSUM62, PAM250 or a file")
+    parser.add_argument("--alphabet", default=AMINO_ACIDS,
+                        help=f"allowed residues, in either case (default {AMINO_ACIDS})")
+    parser.add_argument("--select", nargs="+", metavar="NAME",
+                        help=f"align only the records with these header lines, read through a {INDEX_SUFFIX} index")
+    parser.add_argument("--output-dir", help="directory for the outputs (default: next to each input)")
+    parser.add_argument("--formats", nargs="+", choices=sorted(WRITERS), default=["clustal", "fasta"],
+                        help="alignment files to write (default: clustal fasta)")
+    parser.add_argument("--line-width", type=_non_negative,
+                        help="residues per line or block, 0 for unwrapped (default: 60, Stockholm unwrapped)")
+    parser.add_argument("--gzip", action="store_true", help="compress the alignment files with gzip")
+    parser.add_argument("--save-result", action="store_true",
+                        help=f"also save a binary {RESULT_SUFFIX} result that the GUI can open")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(),
+                        help="input files aligned concurrently (default: number of CPUs)")
+    parser.add_argument("--pair-workers", type=int, help="processes scoring the pairs of one input")
+    parser.add_argument("--engine", choices=ENGINES, default="pairwise", help="center alignment engine")
+    parser.add_argument("--band", type=int, help="largest band half-width for banded DP")
+    parser.add_argument("--time-limit", type=float, help="seconds allowed for aligning one input")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Runs the command line interface.
+
+    Args:
+        argv (list): Arguments without the program name. Defaults to sys.argv[1:].
+
+    Returns:
+        int: Number of inputs that failed, capped at 255, so 0 means success.
+    """
+    arguments = parse_arguments(argv)
+    paths, missing = find_inputs(arguments.inputs)
+    for pattern in missing:
+        print(f"error: {pattern}: no FASTA files found", file=sys.stderr)
+    if arguments.output_dir:
+        os.makedirs(arguments.output_dir, exist_ok=True)
+
+    options = {key: getattr(arguments, key) for key in (
+        "match_score", "mismatch_score", "gap_penalty", "match", "substitution", "gap", "matrix", "alphabet",
+        "select", "output_dir", "formats", "line_width", "gzip", "save_result", "pair_workers", "engine", "band",
+        "time_limit")}
+    stems, conflicts = output_stems(paths, arguments.output_dir)
+
+    failed = len(missing)
+    for group in conflicts:
+        # Neither input is aligned rather than one silently overwriting the other
+        for path in group:
+            failed += 1
+            print(f"error: {path}: outputs would overwrite those of {', '.join(p for p in group if p != path)}",
+                  file=sys.stderr)
+            del stems[path]
+    jobs = [(path, stem, options) for path, stem in stems.items()]
+
+    def report(path, summary, error):
+        nonlocal failed
+        if error is None:
+            print(f"{path}: {summary['sequences']} sequences, score {summary['score']}, "
+                  f"identity {summary['statistics']['identity_percent']}%")
+        else:
+            failed += 1
+            print(f"error: {path}: {error}", file=sys.stderr)
+
+    if len(jobs) > 1 and arguments.jobs > 1:
+        with ProcessPoolExecutor(max_workers=min(arguments.jobs, len(jobs))) as executor:
+            futures = {executor.submit(_run, job): job[0] for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    report(*future.result())
+                except Exception as error:
+                    # A worker that died (e.g. killed for memory) only fails its own input
+                    report(futures[future], None, f"{type(error).__name__}: {error}")
+    else:
+        for job in jobs:
+            report(*_run(job))
+
+    return min(failed, 255)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
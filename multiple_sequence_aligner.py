@@ -1,12 +1,65 @@
+import time
+
 import numpy as np
 
+from pairwise_alignment import (align_banded, align_center_batch, align_linear_space, encode_sequence,
+                                fill_matrix, pair_score, trace_alignment)
+from center_estimation import CENTER_CANDIDATES, KMER_SIZE, shortlist_centers
+from alignment import GAP, Alignment
+from column_profile import ColumnProfile
+from parallel_scoring import compute_pairwise_scores_parallel
+from substitution_matrices import SubstitutionMatrix, get_matrix
+from score_cache import PairwiseScoreCache, sequence_digest
+
+# Above this many matrix cells pairs are aligned in linear space
+LINEAR_SPACE_THRESHOLD = 25_000_000
+
+# Engines for aligning the central sequence with the others
+ENGINES = ("pairwise", "batched")
+
+# Ways of choosing the central sequence
+CENTER_METHODS = ("exact", "kmer")
+
+
+class AlignmentCancelled(Exception):
+    """
+        Raised inside a running alignment once its cancel event is set.
+    """
+
+
+class AlignmentTimeout(AlignmentCancelled):
+    """
+        Raised inside a running alignment once its time limit is used up.
+    """
+
+
+def _gap_profile(aligned):
+    """
+    Measures the gap runs of an aligned sequence.
+
+    Args:
+        aligned (numpy.ndarray): Encoded aligned sequence.
+
+    Returns:
+        numpy.ndarray: Length of the gap run before every residue, followed by the length
+            of the run after the last one.
+    """
+    residues = np.flatnonzero(aligned != GAP)
+    return np.diff(np.concatenate(([-1], residues, [len(aligned)]))) - 1
+
+
 class MultipleSequenceAligner:
     """
         A class for performing multiple sequence alignment using a Center-Start-Method.
     """
-    def __init__(self, sequences, match_score, mismatch_score, gap_penalty, match, substitution, gap):
+    def __init__(self, sequences, match_score, mismatch_score, gap_penalty, match, substitution, gap,
+                 linear_space_threshold=LINEAR_SPACE_THRESHOLD, engine="pairwise", workers=None,
+                 band=None, center_method="exact", center_candidates=CENTER_CANDIDATES, kmer_size=KMER_SIZE,
+                 cache=None, substitution_matrix=None, progress=None, cancel_event=None, time_limit=None):
         """
-        Initializes the aligner with input sequences and scoring parameters.
+        Initializes the aligner with input sequences and scoring parameters. No stage is run
+        here: pairwise scores, center, alignments, score and statistics are computed on first
+        access and kept until the sequences change.
 
         Args:
             sequences (list): List of (name, sequence) tuples.
@@ -16,303 +69,656 @@ class MultipleSequenceAligner:
             match (int): Score used in final alignment match scoring.
             substitution (int): Score used for mismatch in final scoring.
             gap (int): Penalty used for gap in final scoring.
+            linear_space_threshold (int): Number of matrix cells above which a pair is aligned
+                in linear space instead of with the full traceback matrix.
+            engine (str): "pairwise" aligns the central sequence with one sequence at a time,
+                "batched" advances the DP for many of them together, in batches whose direction
+                planes stay within linear_space_threshold cells. Pairs above the threshold, and
+                all pairs when band is set, are aligned one at a time as with "pairwise".
+            workers (int): Number of processes used to score sequence pairs. None or 1 scores
+                them serially.
+            band (int): Largest band half-width for banded DP around the diagonal. Pairs are first
+                computed in a band, which is widened while a better path could lie outside it and
+                abandoned for the full DP past this width. None disables banding.
+            center_method (str): "exact" scores every pair to find the center. "kmer" shortlists
+                center candidates by k-mer profile distance and scores only the candidates
+                against all sequences.
+            center_candidates (int): Number of candidates rescored exactly in "kmer" mode.
+            kmer_size (int): k-mer length used in "kmer" mode.
+            cache (PairwiseScoreCache): Persistent store consulted for pairwise scores and
+                alignments before any DP is run. None disables caching.
+            substitution_matrix (str or SubstitutionMatrix): Pair scores used instead of
+                match_score and mismatch_score in the pairwise DP, e.g. "BLOSUM62", "PAM250",
+                the path of a matrix file or a SubstitutionMatrix.
+            progress (callable): Called as progress(stage, completed, total) from the thread running
+                the alignment, at the start of every stage and after every unit of work. The stages
+                are "scoring" (pairs), "batch aligning" (DP rows of the center, batched engine
+                only), "aligning" (sequences aligned with the center) and "merging" (alignments
+                merged and written out).
+            cancel_event (threading.Event): Checked between units of work; once it is set the
+                running stage raises AlignmentCancelled.
+            time_limit (float): Seconds the stages may run in total before AlignmentTimeout is
+                raised. Only time spent computing counts, and the budget starts over when the
+                sequences change or after a timeout. None means no limit.
         """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+        if center_method not in CENTER_METHODS:
+            raise ValueError(f"Unknown center method {center_method!r}, expected one of {CENTER_METHODS}")
+
         self.sequences = sequences
-        self.__match_score = match_score
-        self.__mismatch_score = mismatch_score
+        if substitution_matrix is None:
+            self.__scoring_matrix = SubstitutionMatrix.flat(match_score, mismatch_score)
+        else:
+            self.__scoring_matrix = get_matrix(substitution_matrix)
         self.__gap_penalty = gap_penalty
         self.__match = match
         self.__substitution = substitution
         self.__gap = gap
-        self.__matrices = self._fill_all_matrices()
-        self.__central_sequence = self._find_central_sequence()
-        self.__alignments_with_cs = self._align_sequences_along_with_cs()
-        self.__merged_cs = self._merge_central_sequence()
-        self.__final_alignments = self._compute_final_alignments()
+        self.__linear_space_threshold = linear_space_threshold
+        self.__engine = engine
+        self.__workers = workers
+        self.__band = band
+        self.__center_method = center_method
+        self.__center_candidates_count = center_candidates
+        self.__kmer_size = kmer_size
+        self.__cache = cache
+        self.__progress = progress
+        self.__cancel_event = cancel_event
+        self.__time_limit = time_limit
+        self.__stage = None
+        self.__stage_started = 0.0
+        self.__completed_units = 0
+        self.__total_units = 0
+        num_sequences = len(sequences)
+        self.__pairwise_scores = np.zeros((num_sequences, num_sequences), dtype=np.int64)
+        self.__scored = np.eye(num_sequences, dtype=bool)
+        self.__score_sums = np.zeros(num_sequences, dtype=np.int64)
+        self._invalidate((None, {}))
+
+    @property
+    def pairwise_scores(self):
+        """
+        numpy.ndarray: Symmetric N x N matrix of pairwise scores. In "kmer" center mode only the
+        rows and columns of the center candidates are guaranteed to be filled.
+        """
+        if self.__center_candidates is None:
+            candidates = self._shortlist_center_candidates()
+            # Only a completed stage is kept, so a cancelled run resumes with the missing pairs
+            self._compute_pairwise_scores(candidates)
+            self.__center_candidates = candidates
+        return self.__pairwise_scores
+
+    @property
+    def center_index(self):
+        """
+        int: Index of the central sequence.
+        """
+        if self.__central_index is None:
+            self.pairwise_scores
+            self.__central_index = self._find_central_sequence()
+        return self.__central_index
+
+    @property
+    def center(self):
+        """
+        tuple: The central sequence (name, sequence).
+        """
+        return self.sequences[self.center_index]
+
+    @property
+    def alignments(self):
+        """
+        list: Pairwise alignments of the central sequence with every other sequence, as
+        ((central_name, aligned_center), (name, aligned_sequence)) with uint8 rows.
+        """
+        if self.__alignments_with_cs is None:
+            previous_center, known = self.__reusable
+            if self.center_index != previous_center:
+                known = {}
+            self.__alignments_with_cs = self._align_sequences_along_with_cs(known)
+            self.__reusable = (None, {})
+        return self.__alignments_with_cs
+
+    @property
+    def final_alignments(self):
+        """
+        Alignment: Final aligned sequences with names.
+        """
+        if self.__final_alignments is None:
+            self.alignments
+            self._start_stage("merging", 2 * len(self.__alignments_with_cs))
+            self.__merged_cs = self._merge_central_sequence()
+            self.__final_alignments = self._compute_final_alignments()
+            self._finish_stage()
+        return self.__final_alignments
+
+    @property
+    def column_profile(self):
+        """
+        ColumnProfile: Per-column counts of the final alignment, shared by the score and statistics.
+        """
+        if self.__column_profile is None:
+            self.__column_profile = ColumnProfile(self.final_alignments.rows)
+        return self.__column_profile
+
+    @property
+    def score(self):
+        """
+        int: Sum-of-pairs score of the final alignment.
+        """
+        if self.__score is None:
+            self.__score = self.column_profile.sum_of_pairs(self.__match, self.__substitution, self.__gap)
+        return self.__score
 
-    def _fill_all_matrices(self):
+    @property
+    def statistics(self):
         """
-        Generates pairwise alignment matrices for all sequence pairs.
+        dict: Statistics of the final alignment (match, mismatch, gap, identity%).
+        """
+        if self.__statistics is None:
+            self.__statistics = self.column_profile.statistics()
+        return self.__statistics
+
+    def add_sequences(self, sequences):
+        """
+        Appends sequences to the alignment, scoring only the pairs they take part in.
+
+        Args:
+            sequences (list): List of (name, sequence) tuples.
+        """
+        sequences = list(sequences)
+        if not sequences:
+            return
+
+        num_old = len(self.sequences)
+        num_sequences = num_old + len(sequences)
+        scores = np.zeros((num_sequences, num_sequences), dtype=np.int64)
+        scored = np.eye(num_sequences, dtype=bool)
+        scores[:num_old, :num_old] = self.__pairwise_scores
+        scored[:num_old, :num_old] = self.__scored
+        reusable = self._reusable_alignments(list(range(num_old)))
+
+        self.sequences = self.sequences + sequences
+        self.__pairwise_scores = scores
+        self.__scored = scored
+        self.__score_sums = np.concatenate((self.__score_sums, np.zeros(len(sequences), dtype=np.int64)))
+        self._invalidate(reusable)
+
+    def remove_sequences(self, indices):
+        """
+        Removes sequences from the alignment. Their scores are subtracted from the score sums
+        and nothing is rescored.
+
+        Args:
+            indices (list): Indices of the sequences to remove.
+        """
+        removed = set(indices)
+        if not removed:
+            return
+        if not removed <= set(range(len(self.sequences))):
+            raise IndexError(f"Sequence indices out of range: {sorted(removed - set(range(len(self.sequences))))}")
+        if len(removed) == len(self.sequences):
+            raise ValueError("Cannot remove every sequence")
+
+        kept = [index for index in range(len(self.sequences)) if index not in removed]
+        dropped = sorted(removed)
+        reusable = self._reusable_alignments([kept.index(index) if index in kept else None
+                                              for index in range(len(self.sequences))])
+
+        self.__score_sums = (self.__score_sums - self.__pairwise_scores[:, dropped].sum(axis=1))[kept]
+        self.__pairwise_scores = self.__pairwise_scores[np.ix_(kept, kept)]
+        self.__scored = self.__scored[np.ix_(kept, kept)]
+        self.sequences = [self.sequences[index] for index in kept]
+        self._invalidate(reusable)
+
+    def replace_sequence(self, index, sequence):
+        """
+        Replaces one sequence, rescoring only the pairs it takes part in.
+
+        Args:
+            index (int): Index of the sequence to replace.
+            sequence (tuple): The new (name, sequence) tuple.
+        """
+        num_sequences = len(self.sequences)
+        if not 0 <= index < num_sequences:
+            raise IndexError(f"Sequence index {index} out of range")
+
+        reusable = self._reusable_alignments([None if other == index else other for other in range(num_sequences)])
+
+        self.__score_sums -= self.__pairwise_scores[:, index]
+        self.__score_sums[index] = 0
+        self.__pairwise_scores[index, :] = self.__pairwise_scores[:, index] = 0
+        self.__scored[index, :] = self.__scored[:, index] = False
+        self.__scored[index, index] = True
+        self.sequences = self.sequences[:index] + [sequence] + self.sequences[index + 1:]
+        self._invalidate(reusable)
+
+    def _reusable_alignments(self, new_indices):
+        """
+        Collects the alignments with the center that survive a change of the sequence list.
+
+        Args:
+            new_indices (list): New index of every current sequence, None if it is dropped or replaced.
+
+        Returns:
+            tuple: (new index of the center they were made with or None,
+                    dict of new index -> aligned sequence pair)
+        """
+        if self.__alignments_with_cs is not None:
+            center = self.__central_index
+            others = [index for index in range(len(self.sequences)) if index != center]
+            known = dict(zip(others, self.__alignments_with_cs))
+        else:
+            center, known = self.__reusable
+        if center is None:
+            return None, {}
+
+        return new_indices[center], {new_indices[index]: alignment for index, alignment in known.items()
+                                     if new_indices[index] is not None}
+
+    def _invalidate(self, reusable):
+        """
+        Drops every stage result after the sequence list changed. The stages are recomputed on
+        demand; scores already known are kept, and the alignments with the center are reused
+        unless the center changes.
+
+        Args:
+            reusable (tuple): Result of _reusable_alignments.
+        """
+        self.__reusable = reusable
+        self.__elapsed = 0.0
+        self.__center_candidates = None
+        self.__central_index = None
+        self.__alignments_with_cs = None
+        self.__merged_cs = None
+        self.__final_alignments = None
+        self.__column_profile = None
+        self.__score = None
+        self.__statistics = None
+
+    def _shortlist_center_candidates(self):
+        """
+        Selects the sequences that may become the center.
 
         Returns:
-            list: List of tuples (seq1, seq2, matrix).
+            list: Candidate indices in ascending order, every index in "exact" mode.
         """
-        matrices = []
         num_sequences = len(self.sequences)
-        for i in range(num_sequences):
-            for j in range(num_sequences):
-                if j > i:
-                    matrices.append((self.sequences[i], self.sequences[j],
-                                     self._fill_matrix(self.sequences[i][1], self.sequences[j][1])))
+        if self.__center_method == "kmer" and num_sequences > self.__center_candidates_count:
+            return shortlist_centers([sequence for _, sequence in self.sequences],
+                                     self.__center_candidates_count, self.__kmer_size)
 
-        return matrices
+        return list(range(num_sequences))
 
-    def _find_central_sequence(self):
+    def _compute_pairwise_scores(self, candidates):
+        """
+        Computes the global alignment score of every pair involving a center candidate that
+        has not been scored yet, without keeping any matrices. The scores and the per-sequence
+        score sums are updated in place; pairs of two non-candidates are left at zero.
+
+        Args:
+            candidates (list): Indices of the center candidates.
+        """
+        num_sequences = len(self.sequences)
+        if len(candidates) == num_sequences:
+            pairs = [(i, j) for i in range(num_sequences) for j in range(i + 1, num_sequences)]
+        else:
+            pairs = sorted({(min(candidate, j), max(candidate, j)) for candidate in candidates
+                            for j in range(num_sequences) if j != candidate})
+        pairs = [(i, j) for i, j in pairs if not self.__scored[i, j]]
+
+        new_scores = {}
+        if self.__cache is not None:
+            # Every sequence is hashed once, not once per pair it is in
+            digests = {index: sequence_digest(self.sequences[index][1]) for pair in pairs for index in pair}
+            scoring = self._pair_scoring()
+            keys = {(i, j): PairwiseScoreCache.score_key_from_digests(digests[i], digests[j], scoring)
+                    for i, j in pairs}
+            found = self.__cache.get_scores(list(keys.values()))
+            new_scores = {pair: found[key] for pair, key in keys.items() if key in found}
+            pairs = [pair for pair in pairs if pair not in new_scores]
+
+        self._start_stage("scoring", len(pairs))
+        if self.__workers is not None and self.__workers > 1:
+            computed = compute_pairwise_scores_parallel([sequence for _, sequence in self.sequences],
+                                                        self.__scoring_matrix, self.__gap_penalty,
+                                                        self.__workers, pairs, self.__band,
+                                                        self._checkpoint)
+            computed = {(i, j): int(computed[i, j]) for i, j in pairs}
+        else:
+            encoded = {}
+            computed = {}
+            for i, j in pairs:
+                for index in (i, j):
+                    if index not in encoded:
+                        encoded[index] = encode_sequence(self.sequences[index][1])
+                computed[(i, j)] = pair_score(encoded[i], encoded[j], self.__scoring_matrix, self.__gap_penalty,
+                                              self.__band)
+                self._checkpoint()
+
+        if self.__cache is not None and computed:
+            self.__cache.put_scores({keys[pair]: score for pair, score in computed.items()})
+
+        new_scores.update(computed)
+        for (i, j), score in new_scores.items():
+            self.__pairwise_scores[i, j] = self.__pairwise_scores[j, i] = score
+            self.__scored[i, j] = self.__scored[j, i] = True
+            self.__score_sums[i] += score
+            self.__score_sums[j] += score
+
+        self._finish_stage()
+
+    def _start_stage(self, stage, total):
+        """
+        Starts timing and reporting a stage of the pipeline.
+
+        Args:
+            stage (str): Name passed to the progress callback.
+            total (int): Number of units of work in the stage.
+        """
+        self.__stage = stage
+        self.__stage_started = time.monotonic()
+        self.__completed_units = 0
+        self.__total_units = total
+        self._checkpoint(0)
+
+    def _finish_stage(self):
+        """
+        Adds the time of the finished stage to the time spent computing.
+        """
+        self.__elapsed += time.monotonic() - self.__stage_started
+        self.__stage = None
+
+    def _checkpoint(self, count=1):
+        """
+        Counts finished units of work of the running stage, reports them and stops the run if
+        it was cancelled or ran out of time.
+
+        Args:
+            count (int): Number of units finished since the last call.
+
+        Raises:
+            AlignmentCancelled: If the cancel event is set.
+            AlignmentTimeout: If the time limit is used up.
         """
-        Identifies the sequence with the highest cumulative alignment score.
+        if self.__cancel_event is not None and self.__cancel_event.is_set():
+            raise AlignmentCancelled(f"The alignment was cancelled while {self.__stage}")
+        if (self.__time_limit is not None
+                and self.__elapsed + time.monotonic() - self.__stage_started > self.__time_limit):
+            self.__elapsed = 0.0
+            raise AlignmentTimeout(f"The alignment exceeded its time limit of {self.__time_limit} s "
+                                   f"while {self.__stage}")
+
+        self.__completed_units += count
+        if self.__progress is not None:
+            self.__progress(self.__stage, self.__completed_units, self.__total_units)
+
+    def _pair_scoring(self):
+        """
+        Gets the parameters that pairwise scores and alignments depend on.
 
         Returns:
-            tuple: The central sequence (name, sequence).
+            tuple: (substitution matrix key, gap_penalty)
         """
-        all_scores = []
-        for sequence in self.sequences:
-            score = 0
-            for se1, seq2, matrix in self.__matrices:
-                if sequence == se1 or sequence == seq2:
-                    score += self._get_matrix_score(matrix)
-            all_scores.append((sequence, score))
+        return (self.__scoring_matrix.key, self.__gap_penalty)
 
-        central_sequence = max(all_scores, key=lambda x: x[1])[0]
+    def _find_central_sequence(self):
+        """
+        Identifies the candidate with the highest cumulative alignment score.
 
-        return central_sequence
+        Returns:
+            int: Index of the central sequence.
+        """
+        candidates = self.__center_candidates
+        return candidates[int(np.argmax(self.__score_sums[candidates]))]
 
-    def _align_sequences_along_with_cs(self):
+    def _align_sequences_along_with_cs(self, known=None):
         """
         Aligns each sequence to the central sequence.
 
+        Only the N-1 pairs involving the central sequence get a traceback matrix. The pair is
+        always filled with the lower-index sequence along the rows, as in the all-pairs order.
+
+        Args:
+            known (dict): Sequence index -> aligned sequence pair already computed against
+                the current center.
+
         Returns:
             list: List of aligned sequence pairs.
         """
+        known = dict(known or {})
+        if self.__engine == "batched":
+            known.update(self._align_sequences_along_with_cs_batched(known))
+
+        self._start_stage("aligning", len(self.sequences) - 1)
+
         alignments = []
-        for seq1,seq2,matrix in self.__matrices:
-            if self.__central_sequence == seq1:
-                alignments.append(self._align_two_sequences(seq1,seq2,matrix))
+        central_sequence = self.sequences[self.__central_index]
+        for index, sequence in enumerate(self.sequences):
+            if index in known:
+                alignments.append(known[index])
 
-            elif self.__central_sequence == seq2:
-                (name1, align1), (name2, align2) = self._align_two_sequences(seq1,seq2,matrix)
+            elif index < self.__central_index:
+                (name1, align1), (name2, align2) = self._align_pair(sequence, central_sequence)
                 alignments.append(((name2, align2), (name1, align1)))
 
+            elif index > self.__central_index:
+                alignments.append(self._align_pair(central_sequence, sequence))
+
+            if index != self.__central_index:
+                self._checkpoint()
 
+        self._finish_stage()
         return alignments
 
-    def _merge_central_sequence(self):
+    def _align_sequences_along_with_cs_batched(self, known):
         """
-        Merges the aligned central sequence with consistent gaps.
+        Aligns the central sequence with the other sequences in batched DPs.
+
+        Partners are sorted by length and grouped so that the direction planes of a batch stay
+        within linear_space_threshold cells. Partners whose pair alone is above the threshold,
+        and all partners when banding is enabled, are left out and aligned by _align_pair.
+
+        Args:
+            known (dict): Sequence indices to skip.
 
         Returns:
-            tuple: Central sequence with gaps merged across all alignments.
+            dict: Sequence index -> aligned sequence pair.
         """
-        alignments = [alignment[0][1] for alignment in self.__alignments_with_cs]
-        alignments = [list("".join(seq)) for seq in alignments]
-        i = 0
-        merged_cs = []
-
-        while True:
-            # Stop if all sequences are passed
-            if all(i >= len(seq) for seq in alignments):
-                break
-
-            # Get current column in case a sequence is shorter, uses gap
-            current_col = [seq[i] if i < len(seq) else '-' for seq in alignments]
-
-            # If any sequence has a gap it inserts a gap into all that don't
-            if '-' in current_col:
-                for seq in alignments:
-                    if i >= len(seq) or seq[i] != '-':
-                        seq.insert(i, '-')
-                merged_cs.append('-')
-                i += 1
+        central_name, central_sequence = self.sequences[self.__central_index]
+        alignments = {}
+        partners = []
+        for index, (name, sequence) in enumerate(self.sequences):
+            if index == self.__central_index or index in known:
+                continue
+            center_first = index > self.__central_index
+            cached = self._cached_alignment(central_sequence, sequence) if center_first \
+                else self._cached_alignment(sequence, central_sequence)
+            if cached is not None:
+                alignments[index] = cached if center_first else cached[::-1]
+            elif not self.__band and \
+                    (len(central_sequence) + 1) * (len(sequence) + 1) <= self.__linear_space_threshold:
+                partners.append((index, sequence))
+
+        # Shortest partners first, so every batch pads little and holds as many as fit
+        partners.sort(key=lambda partner: len(partner[1]))
+        batches = []
+        for partner in partners:
+            batch = batches[-1] if batches else None
+            cells = (len(central_sequence) + 1) * (len(partner[1]) + 1)
+            if batch is None or cells * (len(batch) + 1) > self.__linear_space_threshold:
+                batches.append([partner])
             else:
-                merged_cs.append(alignments[0][i])
-                i += 1
-
-        seq_name = self.__alignments_with_cs[0][0][0]
+                batch.append(partner)
+
+        self._start_stage("batch aligning", len(central_sequence) * len(batches))
+        for batch in batches:
+            aligned = align_center_batch(central_sequence, [sequence for _, sequence in batch],
+                                         [index > self.__central_index for index, _ in batch],
+                                         self.__scoring_matrix, self.__gap_penalty, self._checkpoint)
+            for (index, sequence), (central_align, partner_align) in zip(batch, aligned):
+                alignments[index] = (central_align, partner_align)
+                if index > self.__central_index:
+                    self._store_alignment(central_sequence, sequence, central_align, partner_align)
+                else:
+                    self._store_alignment(sequence, central_sequence, partner_align, central_align)
+        self._finish_stage()
 
-        return (seq_name,merged_cs)
+        return {index: ((central_name, central_align), (self.sequences[index][0], partner_align))
+                for index, (central_align, partner_align) in alignments.items()}
 
-    def _compute_final_alignments(self):
+    def _cached_alignment(self, first_seq, second_seq):
         """
-        Inserts missing gaps and return final aligned sequences.
+        Looks up the alignment of an ordered pair in the cache.
 
         Returns:
-            list: Fully aligned sequences.
-        """
-        final_alignments = []
-        alignments = [alignment[1] for alignment in self.__alignments_with_cs]
-        gaps_indexes = [i for i, char in enumerate(self.__merged_cs[1]) if char == '-']
-
-        # Appends the central sequence
-        final_alignments.append(self.__merged_cs)
-
-        # Inserts gaps where needed
-        for alignment in alignments:
-            new_alignment = alignment[1]
-            if len(new_alignment) < len(self.__merged_cs[1]):
-                for gap_index in gaps_indexes:
-                    if len(new_alignment) < len(self.__merged_cs[1]):
-                        new_alignment.insert(gap_index, '-')
-                final_alignments.append((alignment[0], new_alignment))
-            else:
-                final_alignments.append(alignment)
+            tuple: (align1, align2), or None without a cache or on a miss.
+        """
+        if self.__cache is None:
+            return None
 
-        return final_alignments
+        return self.__cache.get_alignment(PairwiseScoreCache.alignment_key(first_seq, second_seq,
+                                                                           self._pair_scoring()))
 
-    def get_final_alignments(self):
+    def _store_alignment(self, first_seq, second_seq, align1, align2):
         """
-        Gets the list of final aligned sequences.
+        Stores the alignment of an ordered pair in the cache, if there is one.
+        """
+        if self.__cache is not None:
+            self.__cache.put_alignment(PairwiseScoreCache.alignment_key(first_seq, second_seq,
+                                                                        self._pair_scoring()),
+                                       align1, align2)
+
+    def _align_pair(self, first_seq_inp, second_seq_inp):
+        """
+        Aligns two sequences, trying a verified band first and switching to linear space
+        for pairs above the cell threshold.
+
+        Args:
+            first_seq_inp (tuple): (name, sequence_string)
+            second_seq_inp (tuple): (name, sequence_string)
 
         Returns:
-            ist: Aligned sequences with names.
+            tuple: ((name1, aligned_sequence1), (name2, aligned_sequence2))
         """
-        return self.__final_alignments
+        (name1, seq1), (name2, seq2) = first_seq_inp, second_seq_inp
+        aligned = self._cached_alignment(seq1, seq2)
+        if aligned is not None:
+            return ((name1, aligned[0]), (name2, aligned[1]))
 
-    def _fill_matrix(self, first_seq, second_seq):
+        if self.__band:
+            aligned = align_banded(seq1, seq2, self.__scoring_matrix, self.__gap_penalty, self.__band)
+
+        if aligned is None and (len(seq1) + 1) * (len(seq2) + 1) > self.__linear_space_threshold:
+            aligned = align_linear_space(seq1, seq2, self.__scoring_matrix, self.__gap_penalty,
+                                         self.__linear_space_threshold)
+
+        if aligned is None:
+            aligned = trace_alignment(self._fill_matrix(seq1, seq2)[1], seq1, seq2)
+
+        self._store_alignment(seq1, seq2, aligned[0], aligned[1])
+        return ((name1, aligned[0]), (name2, aligned[1]))
+
+    def _merge_central_sequence(self):
         """
-        Constructs the scoring matrix for a single optimal path using dynamic programming.
+        Merges the aligned central sequence with consistent gaps.
+
+        Every alignment with the center is reduced to its gap profile and the merged center
+        gets the longest gap run at every position, in O(N*L) instead of inserting gaps one
+        at a time.
 
         Returns:
-            numpy.ndarray: The filled scoring matrix with backtracking pointers (int, (int, int)).
-        """
-        matrix = np.empty((len(first_seq) + 1, len(second_seq) + 1), dtype=object)
-        first_num = 0
-
-        # Initialize first row
-        for i in range(len(second_seq) + 1):
-            matrix[0][i] = (first_num, (0, i - 1))
-            first_num += self.__gap_penalty
-
-        # Initialize first column
-        first_num = 0
-        for i in range(len(first_seq) + 1):
-            matrix[i][0] = (first_num, (i - 1, 0))
-            first_num += self.__gap_penalty
-
-        # Fill rest of the matrix
-        for i in range(1, len(first_seq) + 1):
-            for j in range(1, len(second_seq) + 1):
-                vertical = matrix[i - 1][j][0] + self.__gap_penalty
-                horizontal = matrix[i][j - 1][0] + self.__gap_penalty
-                if first_seq[i - 1] == second_seq[j - 1]:
-                    diagonal = matrix[i - 1][j - 1][0] + self.__match_score
-                else:
-                    diagonal = matrix[i - 1][j - 1][0] + self.__mismatch_score
+            tuple: Central sequence with gaps merged across all alignments.
+        """
+        central_name, central_sequence = self.center
+        runs = np.zeros(len(central_sequence) + 1, dtype=np.int64)
+        for (_, central_align), _ in self.__alignments_with_cs:
+            np.maximum(runs, _gap_profile(central_align), out=runs)
+            self._checkpoint()
 
-                if vertical == max(vertical, horizontal, diagonal):
-                    matrix[i][j] = (vertical, (i - 1, j))
-                elif horizontal == max(horizontal, vertical, diagonal):
-                    matrix[i][j] = (horizontal, (i, j - 1))
-                else:
-                    matrix[i][j] = (diagonal, (i - 1, j - 1))
+        merged_cs = np.full(len(central_sequence) + int(runs.sum()), GAP, dtype=np.uint8)
+        merged_cs[np.arange(len(central_sequence)) + np.cumsum(runs[:-1])] = encode_sequence(central_sequence)
 
-        return matrix
+        return (central_name, merged_cs)
 
-    def _align_two_sequences(self, first_seq_inp, second_seq_inp, matrix):
+    def _compute_final_alignments(self):
         """
-        Retrieve the optimal alignment path and aligned sequences.
+        Inserts missing gaps and return final aligned sequences.
 
-        Args:
-            first_seq_inp (tuple): (name, sequence_string)
-            second_seq_inp (tuple): (name, sequence_string)
-            matrix (list): Scoring matrix with traceback info.
+        A sequence aligned with fewer columns than the merged center receives its missing gaps
+        at the first gap columns of the merged center. Every row is written once into a
+        preallocated buffer.
 
         Returns:
-            tuple: A tuple containing two aligned sequences in tuple form:
-                   ((name1, aligned_sequence1),(name2, aligned_sequence2)
-        """
-
-
-        name1, seq1 = first_seq_inp
-        name2, seq2 = second_seq_inp
-
-        optimal_path = []
-        align1 = []
-        align2 = []
-        i = len(matrix) - 1
-        j = len(matrix[0]) - 1
-
-        # Traceback path
-        while matrix[i][j][1] != (0, 0):
-            optimal_path.append((i, j))
-            i, j = matrix[i][j][1]
-        optimal_path.append((i, j))
-        optimal_path.append((0, 0))
-        optimal_path = optimal_path[::-1]
-
-        # Create aligned sequences
-        for i in range(len(optimal_path) - 1):
-            if optimal_path[i][0] == optimal_path[i + 1][0]:
-                align1.append("-")
-                align2.append(seq2[optimal_path[i + 1][1] - 1])
-            elif optimal_path[i][1] == optimal_path[i + 1][1]:
-                align1.append(seq1[optimal_path[i + 1][0] - 1])
-                align2.append("-")
-            else:
-                align1.append(seq1[optimal_path[i + 1][0] - 1])
-                align2.append(seq2[optimal_path[i + 1][1] - 1])
+            Alignment: Fully aligned sequences, the central sequence first.
+        """
+        central_name, merged_cs = self.__merged_cs
+        gaps_indexes = np.flatnonzero(merged_cs == GAP)
+        rows = np.full((len(self.__alignments_with_cs) + 1, len(merged_cs)), GAP, dtype=np.uint8)
+
+        # The central sequence comes first
+        rows[0] = merged_cs
+        for row, (_, (_, aligned)) in zip(rows[1:], self.__alignments_with_cs):
+            filled = np.ones(len(merged_cs), dtype=bool)
+            filled[gaps_indexes[:len(merged_cs) - len(aligned)]] = False
+            row[filled] = aligned
+            self._checkpoint()
 
-        return ((name1, align1), (name2, align2))
+        names = [central_name] + [name for _, (name, _) in self.__alignments_with_cs]
+        return Alignment(names, rows)
 
-    def _get_matrix_score(self, matrix):
+    def get_final_alignments(self):
         """
-        Retrieve the highest alignment score from the matrix.
+        Gets the list of final aligned sequences.
 
         Returns:
-            str: The alignment score as a string.
+            Alignment: Aligned sequences with names. Iterating it yields (name, sequence) tuples.
         """
-        return matrix[len(matrix) - 1][len(matrix[0]) - 1][0]
+        return self.final_alignments
 
-    def _get_matrices(self):
+    def _fill_matrix(self, first_seq, second_seq):
         """
-        Get the scoring matrix for a single optimal alignment path with backtracking pointers for each cell in the matrix
+        Constructs the scoring matrix for a single optimal path using dynamic programming.
 
         Returns:
-            numpy.ndarray: The filled scoring matrix with backtracking pointers.
+            tuple: (scores, directions) - integer score matrix and uint8 traceback directions.
         """
-        return self.__matrices
+        return fill_matrix(first_seq, second_seq, self.__scoring_matrix, self.__gap_penalty)
 
-    def get_statistics(self):
+    def get_pairwise_scores(self):
         """
-        Calculates statistics of the final alignment (match, mismatch, gap, identity%).
+        Gets the matrix of global alignment scores of all sequence pairs.
 
         Returns:
-            dict: Statistics of alignment.
+            numpy.ndarray: Symmetric N x N matrix of pairwise scores. In "kmer" center mode
+                only the rows and columns of the center candidates are guaranteed to be filled.
         """
-        num_match = 0
-        num_mismatch = 0
-        num_gap = 0
-        total_columns = len(self.__final_alignments[0][1])  # Assuming all sequences have the same length
-
-        for i in range(total_columns):
-            column_nucleotides = [seq[i] for _, seq in self.__final_alignments]
+        return self.pairwise_scores
 
-            if all(nucl == column_nucleotides[0] for nucl in column_nucleotides):
-                num_match += 1
+    def get_central_sequence(self):
+        """
+        Gets the sequence chosen as the center of the star.
 
-            elif any(nucl == '-' for nucl in column_nucleotides):
-                num_gap += 1
-            else:
-                num_mismatch += 1
+        Returns:
+            tuple: The central sequence (name, sequence).
+        """
+        return self.center
 
-        identity_percent = (num_match / total_columns) * 100
+    def get_statistics(self):
+        """
+        Gets statistics of the final alignment (match, mismatch, gap, identity%).
 
-        return {
-            "match": num_match,
-            "mismatch": num_mismatch,
-            "gap": num_gap,
-            "identity_percent": round(identity_percent, 2)
-        }
+        Returns:
+            dict: Statistics of alignment.
+        """
+        return self.statistics
 
     def get_score(self):
         """
-        Computes the final alignment score for all sequence pairs.
+        Gets the final alignment score for all sequence pairs.
 
         Returns:
             int: Total alignment score.
         """
-        sum = 0
-        for k in range(len(self.__final_alignments)):
-            for l in range(len(self.__final_alignments)):
-                if l > k:
-                    length = len(self.__final_alignments[0][1])
-                    seq1 = self.__final_alignments[k][1]
-                    seq2 = self.__final_alignments[l][1]
-                    for i in range(length):
-                        if seq1[i] == "-" and seq2[i] == "-":
-                            sum += 0
-                        elif seq1[i] == "-" or seq2[i] == "-":
-                            sum += self.__gap
-                        elif seq1[i] == seq2[i]:
-                            sum += self.__match
-                        else:
-                            sum += self.__substitution
-        return sum
\ No newline at end of file
+        return self.score
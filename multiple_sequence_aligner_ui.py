@@ -1,62 +1,79 @@
-from multiple_sequence_aligner import MultipleSequenceAligner
+from multiple_sequence_aligner import AlignmentCancelled, MultipleSequenceAligner
+from fasta_io import FastaError, read_fasta
+from alignment_viewer import AlignmentViewer, LineViewer, load_colors
+from png_export import export_png
+from alignment_writers import WRITERS, open_output
+from result_format import RESULT_SUFFIX, AlignmentResult
+from column_profile import ColumnProfile
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageDraw, ImageFont
-import json
+from collections import OrderedDict
+import hashlib
+import io
 import os
+import queue
+import threading
 from tkinter import filedialog, messagebox
-import re
-
-root = tk.Tk()
-root.title("MSA")
-root.geometry("1000x700")
-root.configure(bg="#f4f4f4")
-
-# Introductory Text
-intro_label = tk.Label(root, text="This is an interactive example of"
-    " Center Start Method used for Multiple Sequence Alignment",
-    font=("Arial", 12), justify="center", wraplength=900)
-intro_label.pack(pady=2)
-
-# Style configuration
-style = ttk.Style()
-style.theme_use("default")
-style.configure("TNotebook.Tab", font=('Helvetica', 12, 'bold'), padding=[20, 10], foreground="#555")
-style.map("TNotebook.Tab",
-              background=[("selected", "#ffffff")],
-              foreground=[("selected", "#000")])
-style.layout("TNotebook.Tab", [
-        ('Notebook.tab', {
-            'sticky': 'nswe',
-            'children': [
-                ('Notebook.padding', {
-                    'side': 'top',
-                    'sticky': 'nswe',
-                    'children': [
-                        ('Notebook.label', {'side': 'top', 'sticky': ''})
-                    ]
-                })
-            ]
-        })])
-style.configure("TNotebook", tabposition='n')
-
-header = tk.Label(root, text="MSA", font=("Helvetica", 22, "bold"), bg="#f4f4f4", fg="#4e8074")
-header.pack(anchor="w", padx=10, pady=(10, 0))
-
-notebook = ttk.Notebook(root)
-notebook.pack(expand=True, fill="both", padx=10, pady=10)
-
-# Initializes tabs names
+
+# Window, notebook and tabs; built by build_window, not on import, so processes that import
+# this module (e.g. PNG export workers started by spawn) do not open a window
+root = None
+notebook = None
 tab_names = ["Input", "Parameters", "CLUSTAL Alignment", "FASTA Alignment", "AlignmentViewer"]
 tabs = {}
-for name in tab_names:
-    frame = ttk.Frame(notebook, padding=20)
-    notebook.add(frame, text=name)
-    tabs[name] = frame
+def build_window():
+    """
+        Creates the main window with its notebook and the empty tabs.
+        """
+    global root, notebook
+    root = tk.Tk()
+    root.title("MSA")
+    root.geometry("1000x700")
+    root.configure(bg="#f4f4f4")
+
+    # Introductory Text
+    intro_label = tk.Label(root, text="This is an interactive example of"
+        " Center Start Method used for Multiple Sequence Alignment",
+        font=("Arial", 12), justify="center", wraplength=900)
+    intro_label.pack(pady=2)
+
+    # Style configuration
+    style = ttk.Style()
+    style.theme_use("default")
+    style.configure("TNotebook.Tab", font=('Helvetica', 12, 'bold'), padding=[20, 10], foreground="#555")
+    style.map("TNotebook.Tab",
+                  background=[("selected", "#ffffff")],
+                  foreground=[("selected", "#000")])
+    style.layout("TNotebook.Tab", [
+            ('Notebook.tab', {
+                'sticky': 'nswe',
+                'children': [
+                    ('Notebook.padding', {
+                        'side': 'top',
+                        'sticky': 'nswe',
+                        'children': [
+                            ('Notebook.label', {'side': 'top', 'sticky': ''})
+                        ]
+                    })
+                ]
+            })])
+    style.configure("TNotebook", tabposition='n')
+
+    header = tk.Label(root, text="MSA", font=("Helvetica", 22, "bold"), bg="#f4f4f4", fg="#4e8074")
+    header.pack(anchor="w", padx=10, pady=(10, 0))
+
+    notebook = ttk.Notebook(root)
+    notebook.pack(expand=True, fill="both", padx=10, pady=10)
+
+    # Initializes tabs
+    for name in tab_names:
+        frame = ttk.Frame(notebook, padding=20)
+        notebook.add(frame, text=name)
+        tabs[name] = frame
 
-notebook.tab(2, state='disabled')
-notebook.tab(3, state='disabled')
-notebook.tab(4, state='disabled')
+    notebook.tab(2, state='disabled')
+    notebook.tab(3, state='disabled')
+    notebook.tab(4, state='disabled')
 
 # Function for mouse scrolling
 def bind_mousewheel(widget, text_widget):
@@ -90,17 +107,16 @@ def setup_placeholder(text_field ):
     text_field.bind("<Key>", on_key_press)
     text_field.bind("<FocusOut>", on_focus_out)
 
-# loaded files
-fasta_contents = []
+# paths of the loaded files
+fasta_paths = []
 def on_submit_btn_click(input_frame_dict, parameters_frame_dict):
     """
         Handles the submit button click event.
 
         - Updates the button label to "Resubmit"
         - Extracts and validates user input and parameters
-        - Runs the multiple sequence alignment
-        - Displays results in various formats
-        - Switches to the results tab if successful
+        - Starts the multiple sequence alignment on a background thread; the results are
+          displayed by poll_alignment_job when it finishes
 
         Args:
             input_frame_dict (dict): Dictionary containing UI elements for input.
@@ -108,18 +124,29 @@ def on_submit_btn_click(input_frame_dict, parameters_frame_dict):
         """
     input_frame_dict['submit_btn'].config(text="Resubmit")
 
-    global fasta_contents
     user_input = input_frame_dict['text_field'].get("1.0", "end-1c")
+    if user_input == placeholder:
+        user_input = ""
 
+    # the loaded files are only read now, so they may have been moved or changed since
     try:
-        all_user_input = extract_names_and_sequences("\n".join(fasta_contents) + user_input)
-    except Exception as e:
+        all_user_input = extract_names_and_sequences(fasta_paths, user_input)
+    except FastaError as e:
+        messagebox.showerror("Invalid sequence", f"{e}. Please correct it.")
+        return
+    except OSError as e:
+        messagebox.showerror("Cannot read file", f"Could not read {e.filename or 'a loaded file'}: "
+                                                 f"{e.strerror or e}. Please load it again.")
+        return
+    except ValueError as e:
+        messagebox.showerror("Incorrect input", str(e))
         return
 
     if all_user_input:
         pass
     else:
         messagebox.showerror("Incorrect input","Incorrect Input, try again")
+        return
 
     def is_valid_number(s):
         return (len(s) > 0 and s.lstrip('-').isdigit() and
@@ -140,12 +167,183 @@ def on_submit_btn_click(input_frame_dict, parameters_frame_dict):
     match = int(parameters_frame_dict['match'].get())
     substitution = int(parameters_frame_dict['substitution'].get())
     gap = int(parameters_frame_dict['gap'].get())
-    aligned_sequences, score, statistics = (get_aligned_sequences_score_statistics
-                                            (all_user_input, match_score, mismatch_score, gap_score, match,
-                                             substitution, gap))
-    print_result_in_clustal_format(aligned_sequences, score, statistics, parameters_frame_dict)
-    print_result_in_fasta_format(aligned_sequences, score, statistics, parameters_frame_dict)
-    print_result_in_alignment_viewer(aligned_sequences, score, statistics)
+
+    # the same input and alignment parameters were aligned before: at most the score changes
+    memo_key = result_memo_key(all_user_input, match_score, mismatch_score, gap_score)
+    result = recall_result(memo_key, match, substitution, gap)
+    if result is not None:
+        show_alignment_result(result)
+        return
+
+    start_alignment_job(input_frame_dict, parameters_frame_dict,
+                        (all_user_input, match_score, mismatch_score, gap_score, match, substitution, gap), memo_key)
+
+# results of recent alignments by input and alignment parameters, least recently used first
+result_memo = OrderedDict()
+RESULT_MEMO_SIZE = 8
+def result_memo_key(user_input, match_score, mismatch_score, gap_score):
+    """
+        Builds the memo key of an alignment: a hash of the names and sequences and the
+        parameters that change the alignment. The final-scoring weights are not part of it.
+
+        Returns:
+            tuple: (input_digest, match_score, mismatch_score, gap_score)
+        """
+    digest = hashlib.sha256()
+    for name, sequence in user_input:
+        digest.update(name.encode("utf-8") + b"\0" + sequence.encode("utf-8") + b"\0")
+    return digest.hexdigest(), match_score, mismatch_score, gap_score
+
+def remember_result(memo_key, result):
+    """
+        Adds a finished alignment to the memo, dropping the least recently used one when full.
+        """
+    result_memo[memo_key] = {'result': result, 'profile': None}
+    result_memo.move_to_end(memo_key)
+    while len(result_memo) > RESULT_MEMO_SIZE:
+        result_memo.popitem(last=False)
+
+def recall_result(memo_key, match, substitution, gap):
+    """
+        Looks up a memoized alignment. If only the final-scoring weights differ, the cached
+        alignment is rescored from its column profile instead of being realigned.
+
+        Args:
+            memo_key (tuple): Key from result_memo_key.
+            match (int): Weight for match in final scoring.
+            substitution (int): Weight for substitution in final scoring.
+            gap (int): Weight for gap in final scoring.
+
+        Returns:
+            AlignmentResult: The result for these weights, or None if the alignment is not memoized.
+        """
+    entry = result_memo.get(memo_key)
+    if entry is None:
+        return None
+
+    result_memo.move_to_end(memo_key)
+    result = entry['result']
+    weights = {"match": match, "substitution": substitution, "gap": gap}
+    if all(result.parameters.get(key) == value for key, value in weights.items()):
+        return result
+
+    if entry['profile'] is None:
+        entry['profile'] = ColumnProfile(result.alignment.rows)
+    return AlignmentResult(result.alignment, result.pairwise_scores, result.center_index,
+                           entry['profile'].sum_of_pairs(match, substitution, gap), result.statistics,
+                           dict(result.parameters, **weights))
+
+# alignment running in the background: its thread, cancel event and message queue
+alignment_job = None
+def start_alignment_job(input_frame_dict, parameters_frame_dict, arguments, memo_key):
+    """
+        Runs get_aligned_sequences_score_statistics on a worker thread so the window stays
+        responsive, and starts polling for its progress.
+
+        Args:
+            input_frame_dict (dict): Dictionary containing UI elements for input.
+            parameters_frame_dict (dict): Dictionary containing UI elements for alignment parameters.
+            arguments (tuple): Positional arguments of get_aligned_sequences_score_statistics.
+            memo_key (tuple): Key the result is memoized under, from result_memo_key.
+        """
+    global alignment_job
+    job = {'cancel_event': threading.Event(), 'queue': queue.Queue(), 'memo_key': memo_key}
+    job['thread'] = threading.Thread(target=run_alignment_job, args=(job, arguments), daemon=True)
+    alignment_job = job
+
+    set_alignment_running(input_frame_dict, parameters_frame_dict, True)
+    # the progress bar and the Cancel button are on the Input tab
+    notebook.select(0)
+    job['thread'].start()
+    root.after(100, lambda: poll_alignment_job(job, input_frame_dict, parameters_frame_dict))
+
+def run_alignment_job(job, arguments):
+    """
+        Worker thread body. Never touches Tk: progress, the result or the error are put on
+        the job queue for the main thread.
+
+        Args:
+            job (dict): The job started by start_alignment_job.
+            arguments (tuple): Positional arguments of get_aligned_sequences_score_statistics.
+        """
+    def progress(stage, completed, total):
+        job['queue'].put(("progress", stage, completed, total))
+
+    try:
+        result = get_aligned_sequences_score_statistics(*arguments, progress=progress,
+                                                        cancel_event=job['cancel_event'])
+    except AlignmentCancelled:
+        job['queue'].put(("cancelled",))
+    except Exception as e:
+        job['queue'].put(("error", e))
+    else:
+        job['queue'].put(("done", result))
+
+def poll_alignment_job(job, input_frame_dict, parameters_frame_dict):
+    """
+        Drains the queue of a running job on the Tk main thread, updates the progress bar and
+        displays the results once the job is done. Reschedules itself with after() until then.
+
+        Args:
+            job (dict): The job started by start_alignment_job.
+            input_frame_dict (dict): Dictionary containing UI elements for input.
+            parameters_frame_dict (dict): Dictionary containing UI elements for alignment parameters.
+        """
+    global alignment_job
+    # a job dropped by reset finishes on its own, its messages are ignored
+    if job is not alignment_job:
+        return
+
+    progress = None
+    while True:
+        try:
+            message = job['queue'].get_nowait()
+        except queue.Empty:
+            message = None
+            break
+        if message[0] != "progress":
+            break
+        progress = message
+
+    if progress is not None:
+        _, stage, completed, total = progress
+        input_frame_dict['progress_bar'].config(maximum=max(total, 1), value=completed)
+        input_frame_dict['progress_label'].config(text=f"{stage.capitalize()}: {completed}/{total}")
+
+    if message is None:
+        root.after(100, lambda: poll_alignment_job(job, input_frame_dict, parameters_frame_dict))
+        return
+
+    alignment_job = None
+    set_alignment_running(input_frame_dict, parameters_frame_dict, False)
+    if message[0] == "cancelled":
+        input_frame_dict['progress_label'].config(text="Alignment cancelled")
+        return
+    if message[0] == "error":
+        input_frame_dict['progress_label'].config(text="")
+        messagebox.showerror("Alignment failed", str(message[1]))
+        return
+
+    input_frame_dict['progress_label'].config(text="")
+    remember_result(job['memo_key'], message[1])
+    show_alignment_result(message[1])
+
+# result shown in the result tabs
+current_result = None
+def show_alignment_result(result):
+    """
+        Fills the result tabs from an alignment result, computed or loaded from a file,
+        and switches to them.
+
+        Args:
+            result (AlignmentResult): The result to display.
+        """
+    global current_result
+    current_result = result
+    # parameters come from the result, the entries may have been edited since
+    print_result_in_clustal_format(result.alignment, result.score, result.statistics, result.parameters)
+    print_result_in_fasta_format(result.alignment, result.score, result.statistics, result.parameters)
+    print_result_in_alignment_viewer(result.alignment, result.score, result.statistics)
 
     notebook.tab(2, state='normal')
     notebook.tab(3, state='normal')
@@ -154,10 +352,71 @@ def on_submit_btn_click(input_frame_dict, parameters_frame_dict):
     # moves to the result tab
     notebook.select(2)
 
+def open_result():
+    """
+        Loads a result saved by save_result. The file is memory-mapped, so even large results
+        are displayed without realigning or reading them whole.
+        """
+    file_path = filedialog.askopenfilename(
+        title="Open alignment result",
+        filetypes=[("Alignment results", f"*{RESULT_SUFFIX}"), ("All files", "*.*")])
+    if not file_path:
+        return
+
+    try:
+        result = AlignmentResult.load(file_path)
+    except (OSError, ValueError) as e:
+        messagebox.showerror("Invalid result", f"Could not open {file_path}: {e}")
+        return
+    show_alignment_result(result)
+
+def save_result():
+    """
+        Saves the displayed result in the binary result format for reloading with open_result.
+        """
+    if current_result is None:
+        messagebox.showinfo("No result", "Run an alignment or open a result first.")
+        return
+
+    file_path = filedialog.asksaveasfilename(
+        defaultextension=RESULT_SUFFIX,
+        filetypes=[("Alignment results", f"*{RESULT_SUFFIX}"), ("All files", "*.*")])
+    if not file_path:
+        return
+
+    # e.g. a full disk, no permission, or on Windows a result file that is still mapped
+    try:
+        current_result.save(file_path)
+    except (OSError, ValueError) as e:
+        messagebox.showerror("Could not save result", f"Could not save {file_path}: {e}")
+
+def set_alignment_running(input_frame_dict, parameters_frame_dict, running):
+    """
+        Switches the buttons and the progress bar between the running and the idle state.
+        """
+    submit_state = "disabled" if running else "normal"
+    input_frame_dict['submit_btn'].config(state=submit_state)
+    parameters_frame_dict['resubmit_btn'].config(state=submit_state)
+    input_frame_dict['cancel_btn'].config(state="normal" if running else "disabled")
+    input_frame_dict['progress_bar'].config(value=0)
+    if running:
+        input_frame_dict['progress_label'].config(text="Aligning...")
+
+def on_cancel_btn_click(input_frame_dict):
+    """
+        Asks the running alignment to stop. The worker stops at its next pairwise job and the
+        poll loop restores the buttons.
+        """
+    if alignment_job is not None:
+        alignment_job['cancel_event'].set()
+        input_frame_dict['cancel_btn'].config(state="disabled")
+        input_frame_dict['progress_label'].config(text="Cancelling...")
+
 def on_reset_btn_click(input_frame_dict, parameters_frame_dict):
     """
        Handles the reset button click event.
 
+       - Cancels a running alignment
        - Clears the input text field and file message
        - Resets the submit button text and input placeholders
        - Disables result tabs
@@ -169,13 +428,21 @@ def on_reset_btn_click(input_frame_dict, parameters_frame_dict):
            parameters_frame_dict (dict): Dictionary with UI elements for alignment parameters.
        """
 
+    global alignment_job
+    if alignment_job is not None:
+        alignment_job['cancel_event'].set()
+        alignment_job = None
+        set_alignment_running(input_frame_dict, parameters_frame_dict, False)
+        input_frame_dict['progress_label'].config(text="")
+
     input_frame_dict['text_field'].delete("1.0", "end")
     input_frame_dict['load_file_message'].config(text="")
 
 
     setup_placeholder(input_frame_dict['text_field'])
-    global fasta_contents
-    fasta_contents = []
+    global fasta_paths, current_result
+    fasta_paths = []
+    current_result = None
 
     input_frame_dict['submit_btn'].config(text="Submit")
 
@@ -196,7 +463,8 @@ def on_reset_btn_click(input_frame_dict, parameters_frame_dict):
     parameters_frame_dict['gap'].insert(0, "-2")
 
 
-def get_aligned_sequences_score_statistics(user_input, match_score, mismatch_score, gap_score, match, substitution, gap):
+def get_aligned_sequences_score_statistics(user_input, match_score, mismatch_score, gap_score, match, substitution, gap,
+                                           progress=None, cancel_event=None):
     """
         Performs multiple sequence alignment and returns the results.
 
@@ -208,14 +476,79 @@ def get_aligned_sequences_score_statistics(user_input, match_score, mismatch_sco
             match (int): Weight for match in statistics.
             substitution (int): Weight for substitution in statistics.
             gap (int): Weight for gap in statistics.
+            progress (callable): Called as progress(stage, completed, total) as the alignment advances.
+            cancel_event (threading.Event): Stops the alignment with AlignmentCancelled once set.
 
         Returns:
-            tuple: (aligned_sequences, alignment_score, statistics)
+            AlignmentResult: Aligned sequences, pairwise scores, center, score, statistics and
+            the parameters above.
         """
-    msa = MultipleSequenceAligner(user_input, match_score, mismatch_score, gap_score, match, substitution, gap)
-    return msa.get_final_alignments(), msa.get_score(), msa.get_statistics()
+    msa = MultipleSequenceAligner(user_input, match_score, mismatch_score, gap_score, match, substitution, gap,
+                                  progress=progress, cancel_event=cancel_event)
+    parameters = {"match_score": match_score, "mismatch_score": mismatch_score, "gap_penalty": gap_score,
+                  "match": match, "substitution": substitution, "gap": gap}
+    return AlignmentResult.from_aligner(msa, parameters)
+
+def save_alignment_report(final_alignments, score, statistics, parameters, format_name, title):
+    """
+        Asks for a file and saves the statistics, the parameters and the alignment in it.
+
+        The alignment is streamed by the writer of format_name, and a path ending in ".gz"
+        is compressed with gzip.
+
+        Args:
+            final_alignments (Alignment): Aligned sequences with their names.
+            score (int): Alignment score.
+            statistics (dict): Contains identity_percent, match, mismatch, and gap counts.
+            parameters (dict): Scoring parameters the alignment was computed with.
+            format_name (str): Key of alignment_writers.WRITERS.
+            title (str): First line of the file.
+        """
+    suffix = WRITERS[format_name][1]
+    file_path = filedialog.asksaveasfilename(
+        defaultextension=suffix,
+        filetypes=[("Alignment files", f"*{suffix}"), ("Compressed files", f"*{suffix}.gz"),
+                   ("Text files", "*.txt"), ("All files", "*.*")]
+    )
+    if not file_path:
+        return
+
+    report = (f"{title}\n"
+              f"Statistics:\n"
+              f"\tIdentity:   {statistics.get('identity_percent')}\n"
+              f"\tScore:   {score}\n"
+              f"\tNumber of Matches:   {statistics.get('match')}\n"
+              f"\tNumber of MisMatches:   {statistics.get('mismatch')}\n"
+              f"\tNumber of Gaps:   {statistics.get('gap')}\n\n"
+              f"Matrix Scores:\n"
+              f"\tMatch Score:   {parameters.get('match_score')}\n"
+              f"\tMismatch Score:   {parameters.get('mismatch_score')}\n"
+              f"\tGap Penalty:   {parameters.get('gap_penalty')}\n\n"
+              f"Scoring Result:\n"
+              f"\tMatch:   {parameters.get('match')}\n"
+              f"\tSubstitution:   {parameters.get('substitution')}\n"
+              f"\tGap:   {parameters.get('gap')}\n"
+              f"Alignments:\n")
+    with open_output(file_path) as file:
+        file.write(report.encode("utf-8"))
+        WRITERS[format_name][0](file, final_alignments)
+
+def print_result_in_clustal_format(final_alignments, score, statistics, parameters):
+    """
+       Displays and enables saving of the multiple sequence alignment in CLUSTAL format.
 
-def print_result_in_clustal_format(final_alignments, score, statistics, parameters_frame_dict):
+       Args:
+           final_alignments (Alignment): Aligned sequences with their names.
+           score (int): Alignment score.
+           statistics (dict): Contains identity_percent, match, mismatch, and gap counts.
+           parameters (dict): Scoring parameters the alignment was computed with.
+
+       Functionality:
+           - Clears previous CLUSTAL tab content.
+           - Displays alignment metadata and statistics.
+           - Allows saving results in CLUSTAL format to a text file.
+           - Renders the visible part of the alignment with an AlignmentViewer in plain text.
+       """
     clustal_alignment = tabs["CLUSTAL Alignment"]
     num_sequences = len(final_alignments)
 
@@ -224,16 +557,9 @@ def print_result_in_clustal_format(final_alignments, score, statistics, paramete
         widget.destroy()
 
     # Style constants
-    ROW_HEIGHT = 22
-    ID_WIDTH = 25
-    CHAR_WIDTH = 8
-    MAX_VISIBLE_ROWS = 15
-    ID_FONT = ("Courier New", 10, "bold")
-    ALIGN_FONT = ("Courier New", 10)
     HEADER_FONT = ("Arial", 11, "bold")
     BG_COLOR = "#f5f5f5"
     HEADER_COLOR = "#3f51b5"
-    TEXT_COLOR = "#333333"
 
     main_frame = ttk.Frame(clustal_alignment, padding=10)
     main_frame.pack(fill="both", expand=True)
@@ -256,176 +582,17 @@ def print_result_in_clustal_format(final_alignments, score, statistics, paramete
 
 
     def save_result_in_clustal_format():
-        """
-           Displays and enables saving of the multiple sequence alignment in CLUSTAL format.
-
-           Args:
-               final_alignments (list): List of (name, alignment_string) tuples.
-               score (int): Alignment score.
-               statistics (dict): Contains identity_percent, match, mismatch, and gap counts.
-               parameters_frame_dict (dict): Dictionary containing Entry widgets for alignment parameters.
-
-           Functionality:
-               - Clears previous CLUSTAL tab content.
-               - Displays alignment metadata and statistics.
-               - Allows saving results in CLUSTAL format to a text file.
-               - Renders sequence alignments with scrollable UI components.
-               - Synchronizes scrolling between ID panel and sequences.
-           """
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
-        )
-        if file_path:
-            max_name_length = max(len(name) for name, _ in final_alignments)
-            with open(file_path, "w", encoding="utf-8") as file:
-
-                file.write(f"Multiple Sequence Alignment in CLUSTAL Format\n")
-                file.write(f"Statistics:\n")
-                file.write(f"\tIdentity:   {statistics.get("identity_percent")}\n")
-                file.write(f"\tScore:   {score}\n")
-                file.write(f"\tNumber of Matches:   {statistics.get("match")}\n")
-                file.write(f"\tNumber of MisMatches:   {statistics.get("mismatch")}\n")
-                file.write(f"\tNumber of Gaps:   {statistics.get("gap")}\n\n")
-
-                file.write(f"Matrix Scores:\n")
-                file.write(f"\tMatch Score:   {parameters_frame_dict["match_score"].get()}\n")
-                file.write(f"\tMismatch Score:   {parameters_frame_dict["mismatch_score"].get()}\n")
-                file.write(f"\tGap Penalty:   {parameters_frame_dict["gap_score"].get()}\n\n")
-
-                file.write(f"Scoring Result:\n")
-                file.write(f"\tMatch:   {parameters_frame_dict["match"].get()}\n")
-                file.write(f"\tSubstitution:   {parameters_frame_dict["substitution"].get()}\n")
-                file.write(f"\tGap:   {parameters_frame_dict["gap"].get()}\n")
-
-                file.write(f"Alignments:\n")
-                for name, alignment in final_alignments:
-                    formatted_line = f"{name.ljust(max_name_length)}  {''.join(alignment)}"
-                    file.write(formatted_line + "\n")
+        save_alignment_report(final_alignments, score, statistics, parameters, "clustal",
+                              "Multiple Sequence Alignment in CLUSTAL Format")
+
     btn_frame = ttk.Frame(main_frame)
     btn_frame.pack(anchor="w", pady=(0, 20), fill="x")
     save_button = tk.Button(btn_frame, text="Save result in CLUSTAL Format", font=HEADER_FONT, fg=HEADER_COLOR,
             bg=BG_COLOR, command=save_result_in_clustal_format)
     save_button.pack(side="top", fill="both")
 
-    # Creates container for horizontal scrollbar
-    h_scroll_frame = ttk.Frame(main_frame)
-    h_scroll_frame.pack(fill="x")
-
-    # Horizontal scrollbar (top)
-    h_scroll = ttk.Scrollbar(h_scroll_frame, orient="horizontal")
-    h_scroll.pack(fill="x")
-
-    # Create dual container for content
-    content_frame = ttk.Frame(main_frame)
-    content_frame.pack(fill="both", expand=True)
-
-    # Vertical scrollbar (right side)
-    v_scroll = ttk.Scrollbar(content_frame, orient="vertical")
-    v_scroll.pack(side="right", fill="y")
-
-    # Create canvas for scrolling
-    canvas = tk.Canvas(
-        content_frame,
-        yscrollcommand=v_scroll.set,
-        bg="white",
-        highlightthickness=0,
-        height=min(num_sequences, MAX_VISIBLE_ROWS) * ROW_HEIGHT,
-    )
-    canvas.pack(side="left", fill="both", expand=True)
-    v_scroll.config(command=canvas.yview)
-
-    # Create inner frame for IDs and sequences
-    inner_frame = ttk.Frame(canvas)
-    canvas.create_window((0, 0), window=inner_frame, anchor="nw")
-
-    # Left panel for IDs
-    id_frame = ttk.Frame(inner_frame, width=ID_WIDTH)
-    id_frame.pack(side="left", fill="y")
-
-    # Right panel for sequences
-    seq_canvas = tk.Canvas(
-        inner_frame,
-        xscrollcommand=h_scroll.set,
-        bg="white",
-        highlightthickness=0
-    )
-    seq_canvas.pack(side="left", fill="both", expand=True)
-    h_scroll.config(command=seq_canvas.xview)
-
-    # Frame inside sequence canvas
-    seq_frame = ttk.Frame(seq_canvas)
-    seq_canvas.create_window((0, 0), window=seq_frame, anchor="nw")
-
-    # Add IDs and sequences
-    for seq_id, alignment in final_alignments:
-
-        # Sequence ID
-        id_label = tk.Label(
-            id_frame,
-            text=seq_id[:ID_WIDTH].ljust(ID_WIDTH),
-            font=ID_FONT,
-            fg=TEXT_COLOR,
-            bg=BG_COLOR,
-            anchor="w",
-            padx=2,
-        )
-        id_label.pack(fill="x", pady=0)
-
-        # Alignment sequence
-        seq_label = tk.Label(
-            seq_frame,
-            text=alignment,
-            font=ALIGN_FONT,
-            fg=TEXT_COLOR,
-            bg="white",
-            anchor="w",
-            padx=2
-        )
-        seq_label.pack(fill="x", pady=0, anchor="w")
-
-
-    # Configure scrolling
-    def configure_scrollregion(event=None):
-        canvas.configure(scrollregion=canvas.bbox("all"))
-        seq_canvas.configure(scrollregion=seq_canvas.bbox("all"))
-
-        max_seq_len = max((len(al) for _, al in final_alignments), default=0)
-        natural_width = max_seq_len * CHAR_WIDTH + 20  # Keep this
-        available_width = clustal_alignment.winfo_width() - id_frame.winfo_width()  # Key change!
-        seq_canvas.config(width=max(natural_width, available_width)) # Key change! Remove -50
-
-    clustal_alignment.bind("<Configure>", configure_scrollregion)
-    inner_frame.bind("<Configure>", configure_scrollregion)
-    seq_frame.bind("<Configure>", configure_scrollregion)
-
-    # Synchronized vertical scrolling
-    def sync_yview(*args):
-        canvas.yview(*args)
-        seq_canvas.yview(*args)
-
-    v_scroll.config(command=sync_yview)
-
-    # Enhanced mouse/trackpad scrolling
-    def _on_scroll(event):
-        if seq_canvas.winfo_exists():
-            if event.delta:
-                seq_canvas.xview_scroll(int(-1 * (event.delta / 120)), "units")
-            elif event.num == 6:
-                seq_canvas.xview_scroll(1, "units")
-            elif event.num == 7:
-                seq_canvas.xview_scroll(-1, "units")
-            else:
-                sync_yview("scroll", int(-1 * (event.delta / 120)) if event.delta else -1, "units")
-
-    seq_canvas.bind_all("<MouseWheel>", _on_scroll)
-    seq_canvas.bind_all("<Button-4>", lambda e: _on_scroll(e))
-    seq_canvas.bind_all("<Button-5>", lambda e: _on_scroll(e))
-    seq_canvas.bind_all("<Shift-MouseWheel>", _on_scroll)
-
-    # Final layout update
-    inner_frame.update_idletasks()
-    configure_scrollregion()
+    # Only the visible rows are drawn, so large and memory-mapped results open quickly
+    AlignmentViewer(main_frame, final_alignments).pack(fill="both", expand=True)
 
 def print_result_in_alignment_viewer(final_alignments,score, statistics):
     """
@@ -433,7 +600,7 @@ def print_result_in_alignment_viewer(final_alignments,score, statistics):
        including statistics and a button to save the alignment as a PNG image.
 
        Args:
-           final_alignments (list of tuples): [(sequence_id, sequence_str), ...]
+           final_alignments (Alignment): Aligned sequences with their names.
            score (int/float): Alignment score.
            statistics (dict): Alignment stats including keys:
                - 'identity_percent'
@@ -444,31 +611,20 @@ def print_result_in_alignment_viewer(final_alignments,score, statistics):
        Behavior:
            - Clears and updates the Tkinter "AlignmentViewer" tab.
            - Shows alignment details and colored sequence.
-           - Adds horizontal and vertical scrollbars.
+           - Draws the visible part of the alignment with an AlignmentViewer.
            - Allows saving the alignment as a PNG file with colored bases.
        """
     viewer_alignment = tabs["AlignmentViewer"]
     num_sequences = len(final_alignments)
 
-    with open("colors.json", "r") as f:
-        color_data = json.load(f)
-        AA_COLORS = {item["nucleotide"]: item["color"] for item in color_data}
-
     # Clear existing widgets
     for widget in viewer_alignment.winfo_children():
         widget.destroy()
 
     # Style constants
-    ROW_HEIGHT = 22
-    CHAR_WIDTH = 8
-    ID_WIDTH = 25
-    MAX_VISIBLE_ROWS = 15
-    ID_FONT = ("Courier New", 10, "bold")
-    ALIGN_FONT = ("Courier New", 12, "bold")
     HEADER_FONT = ("Arial", 11, "bold")
     BG_COLOR = "#f5f5f5"
     HEADER_COLOR = "#3f51b5"
-    TEXT_COLOR = "#333333"
 
     # Main container
     main_frame = ttk.Frame(viewer_alignment, padding=10)
@@ -492,73 +648,28 @@ def print_result_in_alignment_viewer(final_alignments,score, statistics):
         make_label(label).pack(side="left", padx=(0, 14))
 
 
-    def save_result_as_png():
-        with open("colors.json", "r") as f:
-            raw_colors = json.load(f)
-            color_map = {entry["nucleotide"].upper(): entry["color"] for entry in raw_colors}
+    # Read once for the viewer and the PNG export
+    colors = load_colors()
 
-        cell_size = 30
-        name_width = 150
-        padding = 5
-        font = ImageFont.load_default()
-        font_name = ImageFont.truetype("arial.ttf", 15)
-        font_score = ImageFont.truetype("arial.ttf", 13)
-
-        num_rows = len(final_alignments)
-        num_cols = max(len(seq) for _, seq in final_alignments)
-
-        width = name_width + num_cols * cell_size
-        height = (num_rows + 1) * cell_size  # extra row for the score
-
-        img = Image.new("RGB", (width, height), "white")
-        draw = ImageDraw.Draw(img)
-
-        num_sequences = len(final_alignments)
-
-        padding_scoring_x = padding
-        padding_scoring_y = padding
+    def save_result_as_png():
+        # Opens a save dialog to choose destination and filename
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".png",
+            filetypes=[("PNG files", "*.png")])
+        if not file_path:
+            return
 
-        for text in [
+        written = export_png(file_path, final_alignments, colors, header=[
             f"Num of Sequences: {num_sequences}",
             f"Scoring: {score}",
             f"Identity: {statistics.get('identity_percent')}%",
             f"Matches: {statistics.get('match')}",
             f"Mismatches: {statistics.get('mismatch')}",
             f"Gaps: {statistics.get('gap')}",
-        ]:
-            draw.text((padding_scoring_x, padding_scoring_y), text, fill="black", font=font_score)
-            text_width = draw.textlength(text, font=font_score)
-            padding_scoring_x += text_width + 20  # adds space between blocks
-
-        for row_idx, (name, sequence) in enumerate(final_alignments):
-            y = (row_idx + 1) * cell_size  # shifts down for score
-
-            # Draws the sequence name
-            draw.text((5, y + padding), name[:15], fill="black", font=font_name)
-
-            for col_idx, char in enumerate(sequence):
-                x = name_width + col_idx * cell_size
-                color = color_map.get(char.upper(), "#FFFFFF")  # fallback to white
-
-                # Draws colored cell
-                draw.rectangle([x, y, x + cell_size, y + cell_size], fill=color, outline="black")
-
-                # Draws centered character
-                bbox = draw.textbbox((0, 0), char, font=font)
-                w = bbox[2] - bbox[0]
-                h = bbox[3] - bbox[1]
-                draw.text(
-                    (x + (cell_size - w) / 2, y + (cell_size - h) / 2),
-                    char, fill="black", font=font
-                )
-        img.save("alignment.png")
-        # Opens a save dialog to choose destination and filename
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".png",
-            filetypes=[("PNG files", "*.png")])
-
-        if file_path:
-            img.save(file_path)
+        ], workers=1)
+        if len(written) > 1:
+            messagebox.showinfo("Saved in pages", f"The alignment was saved as {len(written)} images:\n"
+                                + "\n".join(written))
 
         # Header
     btn_frame = ttk.Frame(main_frame)
@@ -567,148 +678,26 @@ def print_result_in_alignment_viewer(final_alignments,score, statistics):
             bg=BG_COLOR, command=save_result_as_png)
     save_button.pack(side="top", fill="both")
 
-    # Creates container for horizontal scrollbar
-    h_scroll_frame = ttk.Frame(main_frame)
-    h_scroll_frame.pack(fill="x")
-
-    # Horizontal scrollbar (top)
-    h_scroll = ttk.Scrollbar(h_scroll_frame, orient="horizontal")
-    h_scroll.pack(fill="x")
-
-    # Creates dual container for content
-    content_frame = ttk.Frame(main_frame)
-    content_frame.pack(fill="both", expand=True)
-
-    # Vertical scrollbar (right side)
-    v_scroll = ttk.Scrollbar(content_frame, orient="vertical")
-    v_scroll.pack(side="right", fill="y")
-
-    # Creates canvas for scrolling
-    canvas = tk.Canvas(
-        content_frame,
-        yscrollcommand=v_scroll.set,
-        bg="white",
-        highlightthickness=0,
-        height=min(num_sequences, MAX_VISIBLE_ROWS) * ROW_HEIGHT,
-    )
-    canvas.pack(side="left", fill="both", expand=True)
-    v_scroll.config(command=canvas.yview)
-
-    # Create inner frame for IDs and sequences
-    inner_frame = ttk.Frame(canvas)
-    canvas.create_window((0, 0), window=inner_frame, anchor="nw")
-
-    # Left panel for IDs
-    id_frame = ttk.Frame(inner_frame, width=ID_WIDTH)
-    id_frame.pack(side="left", fill="y")
-
-    # Right panel for sequences
-    seq_canvas = tk.Canvas(
-        inner_frame,
-        xscrollcommand=h_scroll.set,
-        bg="white",
-        highlightthickness=0
-    )
-    seq_canvas.pack(side="left", fill="both", expand=True)
-    h_scroll.config(command=seq_canvas.xview)
-
-    # Frame inside sequence canvas
-    seq_frame = ttk.Frame(seq_canvas)
-    seq_canvas.create_window((0, 0), window=seq_frame, anchor="nw")
-
-    # Adds IDs and sequences
-    for seq_id, alignment in final_alignments:
-        # Sequence ID
-        id_label = tk.Label(
-            id_frame,
-            text=seq_id[:ID_WIDTH].ljust(ID_WIDTH),
-            font=ID_FONT,
-            fg=TEXT_COLOR,
-            bg=BG_COLOR,
-            anchor="w",
-            padx=2,
-        )
-        id_label.pack(fill="x", pady=0)
-
-        # Colored character-by-character alignment display
-        char_row = ttk.Frame(seq_frame)
-        char_row.pack(anchor="w", pady=0)
-
-        for char in alignment:
-            bg = AA_COLORS.get(char.upper(), "white")
-            char_label = tk.Label(
-                char_row,
-                text=char,
-                font=ALIGN_FONT,
-                fg="black",
-                bg=bg,
-                width=2,
-                padx=1,
-                pady=1,
-                borderwidth=1,
-                relief="solid"
-            )
-            char_label.pack(side="left")
-
-    # Configure scrolling
-    def configure_scrollregion(event=None):
-        canvas.configure(scrollregion=canvas.bbox("all"))
-        seq_canvas.configure(scrollregion=seq_canvas.bbox("all"))
-
-        max_seq_len = max((len(al) for _, al in final_alignments), default=0)
-        natural_width = max_seq_len * CHAR_WIDTH + 20  # Keep this
-        available_width = viewer_alignment.winfo_width() - id_frame.winfo_width()  # Key change!
-        seq_canvas.config(width=max(natural_width, available_width)) # Key change! Remove -50
-
-
-
-    viewer_alignment.bind("<Configure>", configure_scrollregion)
-    inner_frame.bind("<Configure>", configure_scrollregion)
-    seq_frame.bind("<Configure>", configure_scrollregion)
-
-    # Synchronized vertical scrolling
-    def sync_yview(*args):
-        canvas.yview(*args)
-        seq_canvas.yview(*args)
-
-    v_scroll.config(command=sync_yview)
-
-    # Enhanced mouse/trackpad scrolling
-    def _on_scroll(event):
-        if seq_canvas.winfo_exists():
-            if event.delta:
-                seq_canvas.xview_scroll(int(-1 * (event.delta / 120)), "units")
-            elif event.num == 6:
-                seq_canvas.xview_scroll(1, "units")
-            elif event.num == 7:
-                seq_canvas.xview_scroll(-1, "units")
-            else:
-                sync_yview("scroll", int(-1 * (event.delta / 120)) if event.delta else -1, "units")
-
-    seq_canvas.bind_all("<MouseWheel>", _on_scroll)
-    seq_canvas.bind_all("<Button-4>", lambda e: _on_scroll(e))
-    seq_canvas.bind_all("<Button-5>", lambda e: _on_scroll(e))
-    seq_canvas.bind_all("<Shift-MouseWheel>", _on_scroll)
-
-    # Final layout update
-    inner_frame.update_idletasks()
-    configure_scrollregion()
-
-def print_result_in_fasta_format(final_alignments,score,statistics, parameters_frame_dict):
+    # Only the visible cells are drawn, so large alignments open and scroll quickly
+    viewer = AlignmentViewer(main_frame, final_alignments, colors)
+    viewer.pack(fill="both", expand=True)
+
+def print_result_in_fasta_format(final_alignments,score,statistics, parameters):
     """
         Display sequence alignments in FASTA format inside a Tkinter tab,
         showing alignment stats and providing a save-to-file option.
 
         Args:
-            final_alignments (list of tuples): [(sequence_id, sequence_str), ...]
+            final_alignments (Alignment): Aligned sequences with their names.
             score (int/float): Alignment score.
             statistics (dict): Alignment statistics with keys:
                 - 'identity_percent', 'match', 'mismatch', 'gap'
-            parameters_frame_dict (dict): GUI elements holding scoring parameters.
+            parameters (dict): Scoring parameters the alignment was computed with.
 
         Behavior:
             - Clears and updates the "FASTA Alignment" tab.
-            - Shows sequence headers and sequences formatted with line breaks.
+            - Shows sequence headers and sequences formatted with line breaks, drawing only
+              the visible lines with a LineViewer.
             - Displays alignment stats and scoring parameters.
             - Allows saving the alignment and stats as a text file in FASTA format.
         """
@@ -720,9 +709,6 @@ def print_result_in_fasta_format(final_alignments,score,statistics, parameters_f
         widget.destroy()
 
     # Style constants
-    ROW_HEIGHT = 22
-    CHAR_WIDTH = 8
-    ID_WIDTH = 25
     MAX_VISIBLE_ROWS = 15
     ID_FONT = ("Courier New", 10, "bold")
     SEQUENCE_FONT = ("Courier New", 10)
@@ -730,7 +716,6 @@ def print_result_in_fasta_format(final_alignments,score,statistics, parameters_f
     BG_COLOR = "#f5f5f5"
     HEADER_COLOR = "#3f51b5"
     TEXT_COLOR = "#333333"
-    RIGHT_PADDING = 18  # Extra space to prevent hiding behind scrollbar
     LINE_LENGTH = 55  # Standard FASTA line length
 
     # Main container
@@ -755,43 +740,9 @@ def print_result_in_fasta_format(final_alignments,score,statistics, parameters_f
         make_label(label).pack(side="left", padx=(0, 14))
 
     def save_result_in_fasta_format():
-        # Saves data to the selected file path
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
-        )
-        if file_path:
-            # First, find the max length of all names
-            max_name_length = max(len(name) for name, _ in final_alignments)
-            # Now write the file
-            with open(file_path, "w", encoding="utf-8") as file:
-
-                file.write(f"Multiple Sequence Alignment in FASTA Format\n")
-                file.write(f"Statistics:\n")
-                file.write(f"\tIdentity:   {statistics.get("identity_percent")}\n")
-                file.write(f"\tScore:   {score}\n")
-                file.write(f"\tNumber of Matches:   {statistics.get("match")}\n")
-                file.write(f"\tNumber of MisMatches:   {statistics.get("mismatch")}\n")
-                file.write(f"\tNumber of Gaps:   {statistics.get("gap")}\n")
-
-
-                file.write(f"Matrix Scores:\n")
-                file.write(f"\tMatch Score:   {parameters_frame_dict["match_score"].get()}\n")
-                file.write(f"\tMismatch Score:   {parameters_frame_dict["mismatch_score"].get()}\n")
-                file.write(f"\tGap Penalty:   {parameters_frame_dict["gap_score"].get()}\n")
-
-                file.write(f"Scoring Result:\n")
-                file.write(f"\tMatch:   {parameters_frame_dict["match"].get()}\n")
-                file.write(f"\tSubstitution:   {parameters_frame_dict["substitution"].get()}\n")
-                file.write(f"\tGap:   {parameters_frame_dict["gap"].get()}\n")
-
-
-                file.write(f"Alignments:\n")
-                for name, alignment in final_alignments:
-                    file.write(f">{name}\n")
-                    formatted = (f"{''.join(alignment)}\n")
-                    file.write(formatted)
-                #file.write(df.to_string(index=False, header=False))
+        save_alignment_report(final_alignments, score, statistics, parameters, "fasta",
+                              "Multiple Sequence Alignment in FASTA Format")
+
         # Header
     btn_frame = ttk.Frame(main_frame)
     btn_frame.pack(anchor="w", pady=(0, 20), fill="x")
@@ -799,109 +750,37 @@ def print_result_in_fasta_format(final_alignments,score,statistics, parameters_f
             bg=BG_COLOR, command=save_result_in_fasta_format)
     save_button.pack(side="top", fill="both")
 
-    # Create container for content
-    content_frame = ttk.Frame(main_frame)
-    content_frame.pack(fill="both", expand=True)
-
-    # Vertical scrollbar
-    v_scroll = ttk.Scrollbar(content_frame, orient="vertical")
-    v_scroll.pack(side="right", fill="y")
-
-    # Create canvas for scrolling
-    canvas = tk.Canvas(
-        content_frame,
-        yscrollcommand=v_scroll.set,
-        bg="white",
-        highlightthickness=0,
-        height=min(num_sequences * 3, MAX_VISIBLE_ROWS * 3) * ROW_HEIGHT
-    )
-    canvas.pack(side="left", fill="both", expand=True, padx=(0, RIGHT_PADDING))
-    v_scroll.config(command=canvas.yview)
-
-    # Create inner frame for FASTA content
-    inner_frame = ttk.Frame(canvas)
-    canvas.create_window((0, 0), window=inner_frame, anchor="nw")
-
-    # Calculate maximum width needed
-    def calculate_max_width():
-        max_header = max(len(f">{seq_id}") for seq_id, _ in final_alignments) if final_alignments else 0
-        max_sequence = LINE_LENGTH  # We're controlling line length to 60 chars
-        return max(max_header, max_sequence) * CHAR_WIDTH + RIGHT_PADDING
-
-    max_width = calculate_max_width()
-
-    # Configure inner frame width
-    inner_frame.config(width=max_width)
-
-    # Add FASTA formatted sequences
-    for seq_id, alignment in final_alignments:
-        # FASTA header line
-        header_label = tk.Label(
-            inner_frame,
-            text=f">{seq_id}",
-            font=ID_FONT,
-            fg=HEADER_COLOR,
-            bg=BG_COLOR,
-            anchor="w",
-            justify="left",
-            width= 110  # Match sequence line length for alignment
-        )
-        header_label.pack(fill="x", anchor="w")
-
-        # Sequence lines (split into standard FASTA chunks)
-        for i in range(0, len(alignment), LINE_LENGTH):
-            chunk = alignment[i:i+LINE_LENGTH]
-            seq_label = tk.Label(
-                inner_frame,
-                text=chunk,
-                font=SEQUENCE_FONT,
-                fg=TEXT_COLOR,
-                bg="white",
-                anchor="w",
-                justify="left",
-                width=LINE_LENGTH  # Fixed width for all lines
-            )
-            seq_label.pack(fill="x", anchor="w")
-
-        # Add empty line between sequences
-        spacer = tk.Label(inner_frame, text="", bg="white", height=1)
-        spacer.pack(fill="x")
-
-    # Configure scrolling with proper padding
-    def configure_scrollregion(event):
-        # Get the required size including all content
-        bbox = canvas.bbox("all")
-        if bbox:
-            # Add right padding to ensure no content is hidden
-            canvas.configure(scrollregion=(0, 0, bbox[2] + RIGHT_PADDING, bbox[3]))
-            # Set canvas width to show full content
-            canvas.config(width=min(bbox[2] + RIGHT_PADDING, main_frame.winfo_width()))
-
-    inner_frame.bind("<Configure>", configure_scrollregion)
-    main_frame.bind("<Configure>", lambda e: configure_scrollregion(None))
-
-    # Mouse wheel scrolling
-    def _on_mousewheel(event):
-        canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+    # Each record is its header, its sequence in LINE_LENGTH chunks and an empty line
+    num_columns = final_alignments.num_columns
+    lines_per_record = -(-num_columns // LINE_LENGTH) + 2
 
-    canvas.bind_all("<MouseWheel>", _on_mousewheel)
+    def fasta_line(index):
+        record, part = divmod(index, lines_per_record)
+        if part == 0:
+            return f">{final_alignments.names[record]}", ID_FONT, HEADER_COLOR
+        if part == lines_per_record - 1:
+            return "", SEQUENCE_FONT, TEXT_COLOR
+        start = (part - 1) * LINE_LENGTH
+        chunk = final_alignments.rows[record, start:start + LINE_LENGTH].tobytes().decode("latin-1")
+        return chunk, SEQUENCE_FONT, TEXT_COLOR
 
-    # Initial configuration
-    inner_frame.update_idletasks()
-    canvas.configure(scrollregion=canvas.bbox("all"))
+    # Only the visible lines are read and drawn, so large and memory-mapped results open quickly
+    LineViewer(main_frame, num_sequences * lines_per_record, fasta_line,
+               visible_lines=MAX_VISIBLE_ROWS * 3).pack(fill="both", expand=True)
 
 
 def load_fasta_or_folder(input_frame_dict):
     """
         Opens a file dialog to select a single .fasta file or a folder containing .fasta files,
-        loads their contents into a global list `fasta_contents`, and updates UI message.
+        adds their paths to the global list `fasta_paths`, and updates UI message. The files
+        are read when the alignment is submitted.
 
         Args:
             input_frame_dict (dict): Contains UI elements, including 'load_file_message' Label for status updates.
 
         Behavior:
             - If user cancels file selection, prompts to select a folder.
-            - Loads .fasta file(s) contents into `fasta_contents`.
+            - Adds the .fasta file path(s) to `fasta_paths`.
             - Shows error if invalid file or no FASTA files in folder.
         """
     selected_path = filedialog.askopenfilename(title="Select a .fasta file or cancel to select folder")
@@ -911,11 +790,9 @@ def load_fasta_or_folder(input_frame_dict):
         if not selected_path:
             return  # user canceled folder selection too, do nothing
 
-    global fasta_contents
     if os.path.isfile(selected_path):
         if selected_path.lower().endswith(".fasta"):
-            with open(selected_path, 'r') as f:
-                fasta_contents.append(f.read())
+            fasta_paths.append(selected_path)
             input_frame_dict['load_file_message'].config(text=f"Loaded FASTA file: {selected_path}")
         else:
             messagebox.showerror("Invalid file", "Selected file is not a .fasta file.")
@@ -927,9 +804,7 @@ def load_fasta_or_folder(input_frame_dict):
             messagebox.showwarning("No FASTA files", "No .fasta files found in the selected folder.")
             return
         for fasta_file in fasta_files:
-            full_path = os.path.join(selected_path, fasta_file)
-            with open(full_path, 'r') as f:
-                fasta_contents.append(f.read())
+            fasta_paths.append(os.path.join(selected_path, fasta_file))
 
 
         """input_frame_dict['load_file_message'].config(text=f"Loaded folder with FASTA files: {selected_path}")
@@ -939,45 +814,32 @@ def load_fasta_or_folder(input_frame_dict):
         return
 
 
-def extract_names_and_sequences(fasta_content):
+def extract_names_and_sequences(paths, text):
     """
-    Extracts sequence names (headers) and their sequences from FASTA content.
+    Reads the records of the loaded FASTA files followed by the ones typed into the text field.
 
-    :param fasta_content: string, the whole content of a FASTA file
+    Records keep their order and duplicate names. If any record contains invalid characters
+    the first one is raised.
+
+    :param paths: list of FASTA file paths
+    :param text: string, FASTA content of the text field
     :return: list of tuples (header_name, sequence)
+    :raises FastaError: for the first invalid record
+    :raises OSError: if a loaded file can no longer be read
     """
-    sequences = {}
-    current_name = None
-    current_seq_lines = []
-
-    for line in fasta_content.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        if line.startswith(">"):
-            # Save previous sequence if any
-            if current_name:
-                sequences[current_name] = "".join(current_seq_lines)
-            # Extract name (header line without '>')
-            current_name = line[1:].strip()
-            current_seq_lines = []
-        else:
-            # Validate sequence line - only amino acid letters
-            if re.fullmatch(r'[ACDEFGHIKLMNPQRSTVWYacdefghiklmnpqrstvwy]+', line):
-                current_seq_lines.append(line)
-            else:
-                messagebox.showerror("Invalid sequence", f"The sequence {current_name} contains invalid characters. Please correct it.")
-                raise Exception("Invalid sequence")
+    records = []
+    invalid = []
+    for source in paths + [io.StringIO(text)]:
+        records.extend(read_fasta(source, invalid=invalid))
 
-    # Save the last sequence
-    if current_name:
-        sequences[current_name] = "".join(current_seq_lines)
+    if invalid:
+        raise invalid[0]
 
-    # Convert to list of tuples and return
-    return list(sequences.items())
+    return records
 
 
 def main():
+    build_window()
 
     # Input tab
     input_frame = tabs["Input"]
@@ -1040,6 +902,25 @@ def main():
     )
     reset_btn.pack(side="right", padx=(0, 10))
 
+    cancel_btn = tk.Button(
+        btn_frame_input,
+        text="Cancel",
+        bg="#8a8a8a",
+        fg="white",
+        activebackground="#6d6d6d",
+        activeforeground="white",
+        state="disabled",
+        **button_style
+    )
+    cancel_btn.pack(side="right", padx=(0, 10))
+
+    # Progress of the running alignment, in completed pairwise jobs
+    progress_bar = ttk.Progressbar(btn_frame_input, orient="horizontal", length=200, mode="determinate")
+    progress_bar.pack(side="right", padx=(0, 10))
+
+    progress_label = tk.Label(btn_frame_input, text="", font=("Arial", 10))
+    progress_label.pack(side="right", padx=(0, 10))
+
     load_file_message = tk.Label(input_frame, text="", font=("Arial", 12))
     load_file_message.pack(side="right", padx=(0, 10))
 
@@ -1048,10 +929,14 @@ def main():
         'submit_btn': submit_btn,
         'reset_btn': reset_btn,
         'load_file_message': load_file_message,
+        'cancel_btn': cancel_btn,
+        'progress_bar': progress_bar,
+        'progress_label': progress_label,
     }
 
     submit_btn.config(command=lambda: on_submit_btn_click(input_frame_dict, parameters_frame_dict))
     reset_btn.config(command=lambda: on_reset_btn_click(input_frame_dict, parameters_frame_dict))
+    cancel_btn.config(command=lambda: on_cancel_btn_click(input_frame_dict))
 
     def paste_example():
         with open("example_sequences", "r") as f:
@@ -1075,6 +960,16 @@ def main():
 
     upload_btn.config(command=lambda: load_fasta_or_folder(input_frame_dict))
 
+    open_result_btn = tk.Button(btn_frame, text="Open Result", command=open_result,
+                                fg="#3e8074", bg="#f4f4f4", bd=0,
+                                font=("Arial", 12), cursor="hand2")
+    open_result_btn.pack(side="left", padx=(20, 0))
+
+    save_result_btn = tk.Button(btn_frame, text="Save Result", command=save_result,
+                                fg="#3e8074", bg="#f4f4f4", bd=0,
+                                font=("Arial", 12), cursor="hand2")
+    save_result_btn.pack(side="left", padx=(20, 0))
+
     # Parameters tab
     param_frame = tabs["Parameters"]
 
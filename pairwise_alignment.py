@@ -0,0 +1,549 @@
+import numpy as np
+
+from alignment import GAP
+
+# Traceback directions stored in the compact direction matrix
+DIAGONAL = 0
+VERTICAL = 1
+HORIZONTAL = 2
+
+
+def encode_sequence(sequence):
+    """
+    Encodes a sequence string into a NumPy array of byte codes.
+
+    Args:
+        sequence (str): Sequence of residues. Already encoded arrays are returned unchanged.
+
+    Returns:
+        numpy.ndarray: uint8 array with one code per residue.
+    """
+    if isinstance(sequence, np.ndarray):
+        return sequence
+    return np.frombuffer(sequence.encode("ascii"), dtype=np.uint8)
+
+
+def render_alignment(moves, first_seq, second_seq):
+    """
+    Builds the two aligned rows from the traceback moves.
+
+    Args:
+        moves (list): Directions from the end of the alignment back to its start.
+        first_seq (str): Sequence placed along the rows.
+        second_seq (str): Sequence placed along the columns.
+
+    Returns:
+        tuple: Two uint8 arrays of aligned byte codes (align1, align2).
+    """
+    moves = np.array(moves[::-1], dtype=np.uint8)
+    align1 = np.full(len(moves), GAP, dtype=np.uint8)
+    align2 = np.full(len(moves), GAP, dtype=np.uint8)
+    align1[moves != HORIZONTAL] = encode_sequence(first_seq)
+    align2[moves != VERTICAL] = encode_sequence(second_seq)
+
+    return align1, align2
+
+
+def _advance_row(previous, current, profile_row, gap_penalty, ramp, vertical, best):
+    """
+    Computes one DP row from the previous one. current[0] must already hold the row boundary.
+
+    Horizontal moves chain inside the row, current[j] = max(best[j], current[j - 1] + gap),
+    so they are resolved with a running maximum over best[j] - j * gap.
+    """
+    np.add(previous[1:], gap_penalty, out=vertical)
+    np.add(previous[:-1], profile_row, out=best)
+    np.maximum(vertical, best, out=best)
+
+    np.subtract(best, ramp[1:], out=current[1:])
+    np.maximum.accumulate(current, out=current)
+    np.add(current, ramp, out=current)
+
+
+def _row_directions(current, vertical, gap_penalty):
+    """
+    Picks the traceback pointer of every cell in a row, preferring vertical > horizontal > diagonal.
+    """
+    row = current[1:]
+    horizontal = current[:-1] + gap_penalty
+    return np.where(vertical == row, VERTICAL, np.where(horizontal == row, HORIZONTAL, DIAGONAL))
+
+
+def fill_matrix(first_seq, second_seq, substitution, gap_penalty):
+    """
+    Fills the global alignment matrices row by row with NumPy operations.
+
+    Scores are kept in a contiguous integer matrix and traceback pointers in a separate
+    uint8 direction matrix. When several moves give the best score the pointer is chosen
+    in the order vertical > horizontal > diagonal.
+
+    Args:
+        first_seq (str): Sequence placed along the rows.
+        second_seq (str): Sequence placed along the columns.
+        substitution (SubstitutionMatrix): Pair scores of the residues.
+        gap_penalty (int): Penalty for a gap.
+
+    Returns:
+        tuple: (scores, directions) matrices of shape (len(first_seq) + 1, len(second_seq) + 1).
+    """
+    first = substitution.encode(first_seq)
+    second = substitution.encode(second_seq)
+    rows, cols = len(first) + 1, len(second) + 1
+
+    scores = np.empty((rows, cols), dtype=np.int64)
+    directions = np.empty((rows, cols), dtype=np.uint8)
+
+    # Gap penalties accumulated along the first row
+    ramp = np.arange(cols, dtype=np.int64) * gap_penalty
+    scores[0] = ramp
+    scores[:, 0] = np.arange(rows, dtype=np.int64) * gap_penalty
+    directions[0] = HORIZONTAL
+    directions[:, 0] = VERTICAL
+
+    profile, first_index = substitution.profile(first, second)
+    vertical = np.empty(cols - 1, dtype=np.int64)
+    best = np.empty(cols - 1, dtype=np.int64)
+
+    for i in range(1, rows):
+        _advance_row(scores[i - 1], scores[i], profile[first_index[i - 1]], gap_penalty, ramp, vertical, best)
+        directions[i, 1:] = _row_directions(scores[i], vertical, gap_penalty)
+
+    return scores, directions
+
+
+def alignment_score(first_seq, second_seq, substitution, gap_penalty):
+    """
+    Computes only the global alignment score, keeping a single DP row in memory.
+
+    The shorter sequence is placed along the columns, so memory is O(min(m, n)).
+
+    Args:
+        first_seq (str or numpy.ndarray): First sequence, as a string or encoded.
+        second_seq (str or numpy.ndarray): Second sequence, as a string or encoded.
+        substitution (SubstitutionMatrix): Pair scores of the residues.
+        gap_penalty (int): Penalty for a gap.
+
+    Returns:
+        int: Score of the bottom-right cell of the alignment matrix.
+    """
+    if len(second_seq) > len(first_seq):
+        first_seq, second_seq = second_seq, first_seq
+    first = substitution.encode(first_seq)
+    second = substitution.encode(second_seq)
+    cols = len(second) + 1
+
+    ramp = np.arange(cols, dtype=np.int64) * gap_penalty
+    profile, first_index = substitution.profile(first, second)
+    previous = ramp.copy()
+    current = np.empty(cols, dtype=np.int64)
+    vertical = np.empty(cols - 1, dtype=np.int64)
+    best = np.empty(cols - 1, dtype=np.int64)
+
+    for i in range(1, len(first) + 1):
+        current[0] = i * gap_penalty
+        _advance_row(previous, current, profile[first_index[i - 1]], gap_penalty, ramp, vertical, best)
+        previous, current = current, previous
+
+    return int(previous[-1])
+
+
+def trace_alignment(directions, first_seq, second_seq):
+    """
+    Follows the traceback pointers from the bottom-right cell back to the origin.
+
+    Args:
+        directions (numpy.ndarray): Direction matrix returned by fill_matrix.
+        first_seq (str): Sequence placed along the rows.
+        second_seq (str): Sequence placed along the columns.
+
+    Returns:
+        tuple: Two uint8 arrays of aligned byte codes (align1, align2).
+    """
+    moves = []
+    i = len(first_seq)
+    j = len(second_seq)
+
+    while i > 0 or j > 0:
+        direction = directions[i, j]
+        moves.append(direction)
+        if direction != HORIZONTAL:
+            i -= 1
+        if direction != VERTICAL:
+            j -= 1
+
+    return render_alignment(moves, first_seq, second_seq)
+
+
+def align_center_batch(center_seq, partners, center_first, substitution, gap_penalty, progress=None):
+    """
+    Aligns the central sequence against all partner sequences at once.
+
+    Partners are padded into one 2D code array and the DP advances over the central sequence,
+    updating the rows of every partner with one set of NumPy operations per central residue.
+    Padding cells never feed cells inside a partner, so each pair gets exactly the pointers
+    fill_matrix would give it. All direction planes are kept, which needs
+    (len(center) + 1) * len(partners) * (longest partner + 1) bytes.
+
+    Args:
+        center_seq (str): Central sequence.
+        partners (list): Partner sequence strings.
+        center_first (list): For each partner, True if the pair is filled with the central
+            sequence along the rows and False if the partner is along the rows. This decides
+            how ties are broken, as in fill_matrix.
+        substitution (SubstitutionMatrix): Pair scores of the residues.
+        gap_penalty (int): Penalty for a gap.
+        progress (callable): Called with no arguments after every DP row; it may raise to
+            abandon the batch.
+
+    Returns:
+        list: (central_alignment, partner_alignment) uint8 arrays of byte codes for every partner.
+    """
+    center = substitution.encode(center_seq)
+    lengths = np.array([len(partner) for partner in partners], dtype=np.int64)
+    num_partners, cols = len(partners), int(lengths.max(initial=0)) + 1
+
+    codes = np.zeros((num_partners, cols - 1), dtype=np.int16)
+    for k, partner in enumerate(partners):
+        codes[k, :len(partner)] = substitution.encode(partner)
+    center_rows = np.asarray(center_first, dtype=bool)[:, None]
+
+    # Moves along the central sequence (ACROSS), along the partner (ALONG) or both (DIAGONAL)
+    across_move, along_move = VERTICAL, HORIZONTAL
+    directions = np.empty((len(center) + 1, num_partners, cols), dtype=np.uint8)
+    directions[0] = along_move
+    directions[:, :, 0] = across_move
+
+    ramp = np.arange(cols, dtype=np.int64) * gap_penalty
+    previous = np.broadcast_to(ramp, (num_partners, cols)).copy()
+    current = np.empty_like(previous)
+    across = np.empty((num_partners, cols - 1), dtype=np.int64)
+    best = np.empty_like(across)
+
+    for t in range(1, len(center) + 1):
+        np.add(previous[:, 1:], gap_penalty, out=across)
+        np.add(previous[:, :-1], substitution.table[center[t - 1]][codes], out=best)
+        np.maximum(across, best, out=best)
+
+        current[:, 0] = t * gap_penalty
+        np.subtract(best, ramp[1:], out=current[:, 1:])
+        np.maximum.accumulate(current, axis=1, out=current)
+        np.add(current, ramp, out=current)
+
+        row = current[:, 1:]
+        across_best = across == row
+        along_best = current[:, :-1] + gap_penalty == row
+        # Vertical > horizontal > diagonal, where vertical is ACROSS only if the center is along the rows
+        directions[t, :, 1:] = np.where(center_rows,
+                                        np.where(across_best, across_move,
+                                                 np.where(along_best, along_move, DIAGONAL)),
+                                        np.where(along_best, along_move,
+                                                 np.where(across_best, across_move, DIAGONAL)))
+        previous, current = current, previous
+        if progress is not None:
+            progress()
+
+    alignments = []
+    for k, partner in enumerate(partners):
+        moves = []
+        t, p = len(center), len(partner)
+        while t > 0 or p > 0:
+            direction = directions[t, k, p]
+            moves.append(direction)
+            if direction != along_move:
+                t -= 1
+            if direction != across_move:
+                p -= 1
+        alignments.append(render_alignment(moves, center_seq, partner))
+
+    return alignments
+
+
+def align_linear_space(first_seq, second_seq, substitution, gap_penalty, max_cells):
+    """
+    Aligns two sequences without the full (m+1) x (n+1) traceback matrix.
+
+    The rows are split recursively: a forward pass keeps only a few checkpoint rows, then every
+    block is refilled from its checkpoint, from the bottom block up, and traced back until the
+    path leaves it through the top row. Blocks always start at column 0, so their boundary
+    column is known and the pointers (and therefore the alignment) are exactly the ones
+    fill_matrix would produce. At most about max_cells scores or pointers are held per level.
+
+    Args:
+        first_seq (str): Sequence placed along the rows.
+        second_seq (str): Sequence placed along the columns.
+        substitution (SubstitutionMatrix): Pair scores of the residues.
+        gap_penalty (int): Penalty for a gap.
+        max_cells (int): Memory budget, in cells, for checkpoints and direction blocks.
+
+    Returns:
+        tuple: Two uint8 arrays of aligned byte codes (align1, align2).
+    """
+    first = substitution.encode(first_seq)
+    second = substitution.encode(second_seq)
+    profile, first_index = substitution.profile(first, second)
+    ramp = np.arange(len(second) + 1, dtype=np.int64) * gap_penalty
+
+    moves = []
+    column = _trace_block(ramp, 0, len(first), len(second), profile, first_index, gap_penalty, ramp,
+                          max(int(max_cells), 1), moves)
+
+    # Remaining path runs along the first row
+    moves.extend([HORIZONTAL] * column)
+
+    return render_alignment(moves, first_seq, second_seq)
+
+
+def _trace_block(top_row, first_row, last_row, last_col, profile, first_index, gap_penalty, ramp, max_cells,
+                 moves):
+    """
+    Traces the path from (last_row, last_col) up to first_row, appending the moves.
+
+    Args:
+        top_row (numpy.ndarray): Scores of row first_row, columns 0..last_col.
+
+    Returns:
+        int: Column at which the path reaches first_row.
+    """
+    cols = last_col + 1
+    num_rows = last_row - first_row
+    if num_rows == 0:
+        return last_col
+
+    vertical = np.empty(cols - 1, dtype=np.int64)
+    best = np.empty(cols - 1, dtype=np.int64)
+    ramp = ramp[:cols]
+
+    if num_rows * cols <= max_cells or num_rows == 1:
+        directions = np.empty((num_rows + 1, cols), dtype=np.uint8)
+        directions[:, 0] = VERTICAL
+        previous = top_row[:cols].copy()
+        current = np.empty(cols, dtype=np.int64)
+        for i in range(first_row + 1, last_row + 1):
+            current[0] = i * gap_penalty
+            _advance_row(previous, current, profile[first_index[i - 1]][:cols - 1], gap_penalty, ramp,
+                         vertical, best)
+            directions[i - first_row, 1:] = _row_directions(current, vertical, gap_penalty)
+            previous, current = current, previous
+
+        i, j = last_row, last_col
+        while i > first_row:
+            direction = directions[i - first_row, j]
+            moves.append(direction)
+            if direction != HORIZONTAL:
+                i -= 1
+            if direction != VERTICAL:
+                j -= 1
+        return j
+
+    # Split the rows into blocks whose checkpoints fit into the memory budget
+    num_blocks = min(num_rows, max(2, max_cells // cols))
+    boundaries = np.linspace(first_row, last_row, num_blocks + 1).astype(int)
+    checkpoints = np.empty((num_blocks, cols), dtype=np.int64)
+    checkpoints[0] = top_row[:cols]
+    previous = top_row[:cols].copy()
+    current = np.empty(cols, dtype=np.int64)
+    block = 1
+    for i in range(first_row + 1, boundaries[-2] + 1):
+        current[0] = i * gap_penalty
+        _advance_row(previous, current, profile[first_index[i - 1]][:cols - 1], gap_penalty, ramp,
+                     vertical, best)
+        previous, current = current, previous
+        if block < num_blocks and i == boundaries[block]:
+            checkpoints[block] = previous
+            block += 1
+
+    column = last_col
+    for block in range(num_blocks - 1, -1, -1):
+        column = _trace_block(checkpoints[block], boundaries[block], boundaries[block + 1], column, profile,
+                              first_index, gap_penalty, ramp, max_cells, moves)
+
+    return column
+
+
+# Scores of cells outside the band; far below any reachable score but safe from overflow
+_OUTSIDE_BAND = np.iinfo(np.int64).min // 4
+
+# Smallest band half-width tried by the banded aligner
+MIN_BAND = 8
+
+
+def _fill_band(first, second, profile, first_index, gap_penalty, lower, upper, keep_directions):
+    """
+    Fills only the cells whose diagonal j - i lies in [lower, upper].
+
+    Returns:
+        tuple: (score, directions) - directions[i, j - i - lower] holds the pointer of cell (i, j),
+               or None when keep_directions is False.
+    """
+    rows, cols = len(first) + 1, len(second) + 1
+    ramp = np.arange(cols, dtype=np.int64) * gap_penalty
+    previous = np.full(cols, _OUTSIDE_BAND, dtype=np.int64)
+    current = np.full(cols, _OUTSIDE_BAND, dtype=np.int64)
+    directions = None
+    if keep_directions:
+        directions = np.empty((rows, upper - lower + 1), dtype=np.uint8)
+
+    end = min(cols - 1, upper)
+    previous[:end + 1] = ramp[:end + 1]
+    if keep_directions:
+        directions[0, -lower:-lower + end + 1] = HORIZONTAL
+
+    for i in range(1, rows):
+        start, end = max(0, i + lower), min(cols - 1, i + upper)
+        first_col = max(start, 1)
+
+        vertical = previous[first_col:end + 1] + gap_penalty
+        best = np.maximum(vertical, previous[first_col - 1:end] + profile[first_index[i - 1]][first_col - 1:end])
+        if start == 0:
+            current[0] = i * gap_penalty
+        np.subtract(best, ramp[first_col:end + 1], out=current[first_col:end + 1])
+        window = current[start:end + 1]
+        np.maximum.accumulate(window, out=window)
+        np.add(window, ramp[start:end + 1], out=window)
+
+        if keep_directions:
+            offset = i + lower
+            row = current[first_col:end + 1]
+            horizontal = current[first_col - 1:end] + gap_penalty
+            if start > 0:
+                # The left neighbour of the first cell lies outside the band
+                horizontal[0] = _OUTSIDE_BAND
+            directions[i, first_col - offset:end + 1 - offset] = np.where(
+                vertical == row, VERTICAL, np.where(horizontal == row, HORIZONTAL, DIAGONAL))
+            if start == 0:
+                directions[i, -offset] = VERTICAL
+
+        previous, current = current, previous
+
+    return int(previous[cols - 1]), directions
+
+
+def _required_band(score, m, n, substitution, gap_penalty):
+    """
+    Finds the smallest band half-width k for which no path leaving the band can reach score.
+
+    A path touching a diagonal outside the band needs at least |n - m| + 2k + 2 gaps, and with
+    G gaps it scores at most G * gap + (m + n - G) / 2 * (highest pair score). The bound is
+    linear in G, so only the ends of the range G_min..m+n have to be checked.
+
+    Returns:
+        int: The smallest such k. min(m, n) means only the full matrix is safe.
+    """
+    full = min(m, n)
+    best_pair = substitution.max_score
+    # Bounds are doubled to stay in integers
+    slope = 2 * gap_penalty - best_pair
+    if slope >= 0:
+        return 0 if 2 * (m + n) * gap_penalty < 2 * score else full
+
+    excess = (m + n) * best_pair - 2 * score
+    min_gaps = max(excess // -slope + 1, 0)
+    band = -(-(min_gaps - abs(n - m) - 2) // 2)
+    return min(max(band, 0), full)
+
+
+def _banded(first_seq, second_seq, substitution, gap_penalty, max_band, keep_directions):
+    """
+    Runs the banded DP and widens the band once if the exactness check fails.
+
+    The score of a narrow band is a lower bound of the optimum, so the half-width it requires
+    is enough for every wider band as well: a second pass at that width always passes.
+
+    Returns:
+        tuple: (score, directions, lower) or None if the band would exceed max_band or cover
+               most of the matrix anyway.
+    """
+    first = substitution.encode(first_seq)
+    second = substitution.encode(second_seq)
+    m, n = len(first), len(second)
+    profile, first_index = substitution.profile(first, second)
+
+    band = min(max(MIN_BAND, abs(n - m)), max_band)
+    while True:
+        if 2 * band + abs(n - m) + 1 > min(m, n) // 2:
+            # The band would not save enough cells over the full DP
+            return None
+        lower, upper = min(0, n - m) - band, max(0, n - m) + band
+        score, directions = _fill_band(first, second, profile, first_index, gap_penalty, lower, upper,
+                                       keep_directions)
+        required = _required_band(score, m, n, substitution, gap_penalty)
+        if required <= band:
+            return score, directions, lower
+        if required > max_band:
+            return None
+        band = required
+
+
+def banded_alignment_score(first_seq, second_seq, substitution, gap_penalty, max_band):
+    """
+    Computes the global alignment score from cells within a band around the diagonal.
+
+    The band spans the length difference plus k cells on each side. It starts at
+    max(MIN_BAND, |m - n|), capped by max_band, and is widened once when a path outside
+    it could still reach the banded score.
+
+    Args:
+        first_seq (str or numpy.ndarray): First sequence, as a string or encoded.
+        second_seq (str or numpy.ndarray): Second sequence, as a string or encoded.
+        substitution (SubstitutionMatrix): Pair scores of the residues.
+        gap_penalty (int): Penalty for a gap.
+        max_band (int): Largest band half-width k to try.
+
+    Returns:
+        int: The exact global alignment score, or None if it could not be proven within max_band.
+    """
+    result = _banded(first_seq, second_seq, substitution, gap_penalty, max_band, False)
+    return None if result is None else result[0]
+
+
+def align_banded(first_seq, second_seq, substitution, gap_penalty, max_band):
+    """
+    Aligns two sequences with a banded DP whose band is verified to contain every optimal path.
+
+    When the check passes, the pointers along the traceback are the ones fill_matrix would
+    produce, so the alignment is identical.
+
+    Args:
+        first_seq (str): Sequence placed along the rows.
+        second_seq (str): Sequence placed along the columns.
+        substitution (SubstitutionMatrix): Pair scores of the residues.
+        gap_penalty (int): Penalty for a gap.
+        max_band (int): Largest band half-width k to try.
+
+    Returns:
+        tuple: Two uint8 arrays of aligned byte codes (align1, align2), or None if the band could
+               not be proven exact within max_band.
+    """
+    result = _banded(first_seq, second_seq, substitution, gap_penalty, max_band, True)
+    if result is None:
+        return None
+
+    _, directions, lower = result
+    moves = []
+    i = len(first_seq)
+    j = len(second_seq)
+
+    while i > 0 or j > 0:
+        direction = directions[i, j - i - lower]
+        moves.append(direction)
+        if direction != HORIZONTAL:
+            i -= 1
+        if direction != VERTICAL:
+            j -= 1
+
+    return render_alignment(moves, first_seq, second_seq)
+
+
+def pair_score(first_seq, second_seq, substitution, gap_penalty, max_band=None):
+    """
+    Computes a pairwise global score, trying a verified band first when max_band is given.
+
+    Returns:
+        int: The exact global alignment score.
+    """
+    if max_band:
+        score = banded_alignment_score(first_seq, second_seq, substitution, gap_penalty, max_band)
+        if score is not None:
+            return score
+
+    return alignment_score(first_seq, second_seq, substitution, gap_penalty)
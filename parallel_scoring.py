@@ -0,0 +1,111 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from pairwise_alignment import encode_sequence, pair_score
+
+# Sequence buffer and scoring parameters attached by every worker process
+_worker_state = {}
+
+
+def _attach_shared_sequences(memory_name, offsets, scoring):
+    """
+    Pool initializer: attaches the shared sequence buffer once per worker process.
+
+    Args:
+        memory_name (str): Name of the shared memory block with the concatenated sequences.
+        offsets (numpy.ndarray): Start of every sequence in the buffer, plus the total length.
+        scoring (tuple): (substitution, gap_penalty, band).
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    _worker_state["memory"] = memory
+    _worker_state["buffer"] = np.ndarray((int(offsets[-1]),), dtype=np.uint8, buffer=memory.buf)
+    _worker_state["offsets"] = offsets
+    _worker_state["scoring"] = scoring
+
+
+def _score_pairs(pairs):
+    """
+    Scores a chunk of (i, j) pairs with the sequences read from shared memory.
+
+    Returns:
+        list: Scores in the order of the pairs.
+    """
+    buffer = _worker_state["buffer"]
+    offsets = _worker_state["offsets"]
+    scores = []
+    for i, j in pairs:
+        first = buffer[offsets[i]:offsets[i + 1]]
+        second = buffer[offsets[j]:offsets[j + 1]]
+        scores.append(pair_score(first, second, *_worker_state["scoring"]))
+
+    return scores
+
+
+def compute_pairwise_scores_parallel(sequences, substitution, gap_penalty, workers,
+                                     pairs=None, band=None, progress=None):
+    """
+    Computes pairwise global alignment scores on a process pool.
+
+    The sequences are copied once into a shared memory block which every worker attaches
+    when it starts, so tasks only carry pair indices. The longest pairs are scheduled first
+    and every score is written to its own cell, so the result does not depend on the
+    order in which the workers finish.
+
+    Args:
+        sequences (list): Sequence strings.
+        substitution (SubstitutionMatrix): Pair scores of the residues.
+        gap_penalty (int): Penalty for a gap.
+        workers (int): Number of worker processes.
+        pairs (list): (i, j) index pairs to score. Defaults to every pair with i < j.
+        band (int): Largest band half-width for banded scoring, None for the full DP.
+        progress (callable): Called with the number of pairs in every finished chunk. If it
+            raises, the chunks not started yet are cancelled and the exception propagates.
+
+    Returns:
+        numpy.ndarray: Symmetric N x N matrix of pairwise scores, zero where not computed.
+    """
+    num_sequences = len(sequences)
+    scores = np.zeros((num_sequences, num_sequences), dtype=np.int64)
+    if pairs is None:
+        pairs = [(i, j) for i in range(num_sequences) for j in range(i + 1, num_sequences)]
+    if not pairs:
+        return scores
+
+    encoded = [encode_sequence(sequence) for sequence in sequences]
+    lengths = np.array([len(sequence) for sequence in encoded], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+
+    # Longest pairs first, in small chunks so the tail of the schedule stays balanced
+    pairs = sorted(pairs, key=lambda pair: -(lengths[pair[0]] + 1) * (lengths[pair[1]] + 1))
+    chunk_size = max(1, len(pairs) // (workers * 16))
+    chunks = [pairs[k:k + chunk_size] for k in range(0, len(pairs), chunk_size)]
+
+    memory = shared_memory.SharedMemory(create=True, size=max(int(offsets[-1]), 1))
+    try:
+        buffer = np.ndarray((int(offsets[-1]),), dtype=np.uint8, buffer=memory.buf)
+        for sequence, start in zip(encoded, offsets):
+            buffer[start:start + len(sequence)] = sequence
+        del buffer
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_shared_sequences,
+                                 initargs=(memory.name, offsets,
+                                           (substitution, gap_penalty, band))
+                                 ) as executor:
+            futures = {executor.submit(_score_pairs, chunk): chunk for chunk in chunks}
+            try:
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    for (i, j), score in zip(chunk, future.result()):
+                        scores[i, j] = scores[j, i] = score
+                    if progress is not None:
+                        progress(len(chunk))
+            except BaseException:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        memory.close()
+        memory.unlink()
+
+    return scores
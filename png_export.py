@@ -0,0 +1,287 @@
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+# Side of one residue cell in pixels
+CELL_SIZE = 30
+NAME_WIDTH = 150
+PADDING = 5
+# Largest number of alignment columns and rows drawn into one PNG file
+PAGE_COLUMNS = 200
+PAGE_ROWS = 200
+# Largest page in pixels, well below Pillow's decompression bomb limit so pages open anywhere
+MAX_PAGE_PIXELS = 40_000_000
+# Rows of cells rendered and compressed at a time
+STRIP_ROWS = 8
+# Memory assumed for one rendering process: the interpreter, numpy, Pillow and a few strips
+WORKER_MEMORY = 256 * 1024 * 1024
+
+# Glyph masks rendered once per process, by cell size
+_glyph_cache = {}
+
+
+def _font(size):
+    """
+    Loads Arial at the given size, falling back to Pillow's default font where it is missing.
+    """
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def _glyphs(cell_size):
+    """
+    Renders every printable ASCII character once, centered in a cell.
+
+    Returns:
+        numpy.ndarray: 256 x cell_size x cell_size uint8 ink coverage, zero for byte codes
+            without a glyph.
+    """
+    if cell_size not in _glyph_cache:
+        font = ImageFont.load_default()
+        glyphs = np.zeros((256, cell_size, cell_size), dtype=np.uint8)
+        for code in range(33, 127):
+            sprite = Image.new("L", (cell_size, cell_size), 0)
+            draw = ImageDraw.Draw(sprite)
+            left, top, right, bottom = draw.textbbox((0, 0), chr(code), font=font)
+            draw.text(((cell_size - (right - left)) / 2 - left, (cell_size - (bottom - top)) / 2 - top),
+                      chr(code), fill=255, font=font)
+            glyphs[code] = np.asarray(sprite)
+        _glyph_cache[cell_size] = glyphs
+    return _glyph_cache[cell_size]
+
+
+def color_table(colors):
+    """
+    Converts residue colors to an RGB lookup table.
+
+    Args:
+        colors (list): Color per byte code, as returned by alignment_viewer.load_colors. Any
+            color string Pillow understands is accepted.
+
+    Returns:
+        numpy.ndarray: 256 x 3 uint8 table.
+    """
+    return np.array([ImageColor.getrgb(color)[:3] for color in colors], dtype=np.uint8)
+
+
+def cell_sprites(table, cell_size=CELL_SIZE):
+    """
+    Pre-renders the finished cell of every byte code: its color, the black residue on top
+    and the black outline on the top and left edges.
+
+    Args:
+        table (numpy.ndarray): 256 x 3 RGB table from color_table.
+        cell_size (int): Side of one cell in pixels.
+
+    Returns:
+        numpy.ndarray: 256 x cell_size x cell_size x 3 uint8 sprites.
+    """
+    ink = _glyphs(cell_size).astype(np.uint16)
+    # Black text over the cell color: the color is scaled by the uncovered share of each pixel
+    sprites = (table.astype(np.uint16)[:, None, None, :] * (255 - ink[..., None]) // 255).astype(np.uint8)
+    sprites[:, 0] = 0
+    sprites[:, :, 0] = 0
+    return sprites
+
+
+def render_cells(codes, sprites):
+    """
+    Rasterizes a block of the alignment by stamping one sprite per cell with a single
+    gather, so nothing is drawn cell by cell.
+
+    Args:
+        codes (numpy.ndarray): n x c uint8 block of the alignment matrix.
+        sprites (numpy.ndarray): Cell sprites from cell_sprites.
+
+    Returns:
+        numpy.ndarray: (n * cell_size) x (c * cell_size) x 3 uint8 image, without the
+            closing outline on the bottom and right edges.
+    """
+    num_rows, num_columns = codes.shape
+    cell_size = sprites.shape[1]
+    return sprites[codes].transpose(0, 2, 1, 3, 4).reshape(num_rows * cell_size, num_columns * cell_size, 3)
+
+
+def page_shape(cell_size=CELL_SIZE, page_rows=PAGE_ROWS, page_columns=PAGE_COLUMNS):
+    """
+    Shrinks the page size in cells until a full page fits in MAX_PAGE_PIXELS.
+
+    Args:
+        cell_size (int): Side of one cell in pixels.
+        page_rows (int): Requested largest number of sequences on one page.
+        page_columns (int): Requested largest number of alignment columns on one page.
+
+    Returns:
+        tuple: (page_rows, page_columns) that are actually used.
+    """
+    def pixels(rows, columns):
+        return ((rows + 1) * cell_size + 1) * (columns * cell_size + NAME_WIDTH + 1)
+
+    page_rows, page_columns = max(page_rows, 1), max(page_columns, 1)
+    while pixels(page_rows, page_columns) > MAX_PAGE_PIXELS and (page_rows > 1 or page_columns > 1):
+        # Cut the longer side first so pages stay roughly square
+        if page_columns >= page_rows:
+            page_columns = max(page_columns * 9 // 10, 1)
+        else:
+            page_rows = max(page_rows * 9 // 10, 1)
+    return page_rows, page_columns
+
+
+def _png_chunk(tag, data):
+    """
+    Frames one PNG chunk: length, tag, data and CRC.
+    """
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+
+def _write_png(path, width, height, strips):
+    """
+    Writes an RGB PNG from horizontal strips, compressing each strip as it arrives, so only
+    one strip is held in memory.
+
+    Args:
+        path (str): Output path.
+        width (int): Image width in pixels.
+        height (int): Image height in pixels, the total height of the strips.
+        strips (iterable): h x width x 3 uint8 arrays, top to bottom.
+    """
+    # Fast deflate: large pages are mostly flat color and still compress well
+    compressor = zlib.compressobj(1)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        for strip in strips:
+            # Every scanline starts with filter type 0
+            scanlines = np.zeros((strip.shape[0], width * 3 + 1), dtype=np.uint8)
+            scanlines[:, 1:] = strip.reshape(strip.shape[0], width * 3)
+            data = compressor.compress(scanlines.tobytes())
+            if data:
+                f.write(_png_chunk(b"IDAT", data))
+        f.write(_png_chunk(b"IDAT", compressor.flush()))
+        f.write(_png_chunk(b"IEND", b""))
+
+
+def _page_strips(codes, names, table, header, cell_size):
+    """
+    Yields one page top to bottom: the header band, then STRIP_ROWS rows of cells at a time
+    with their names, then the closing outline.
+    """
+    num_rows, num_columns = codes.shape
+    sprites = cell_sprites(table, cell_size)
+    width = NAME_WIDTH + num_columns * cell_size + 1
+    font_name = _font(15)
+    font_header = _font(13)
+
+    band = Image.new("RGB", (width, cell_size), "white")
+    draw = ImageDraw.Draw(band)
+    x = PADDING
+    for text in header:
+        draw.text((x, PADDING), text, fill="black", font=font_header)
+        x += draw.textlength(text, font=font_header) + 20
+    yield np.asarray(band)
+
+    for first in range(0, num_rows, STRIP_ROWS):
+        block = codes[first:first + STRIP_ROWS]
+        strip = np.zeros((block.shape[0] * cell_size, width, 3), dtype=np.uint8)
+
+        names_band = Image.new("RGB", (NAME_WIDTH, strip.shape[0]), "white")
+        draw = ImageDraw.Draw(names_band)
+        for index, name in enumerate(names[first:first + STRIP_ROWS]):
+            draw.text((PADDING, index * cell_size + PADDING), name[:15], fill="black", font=font_name)
+        strip[:, :NAME_WIDTH] = np.asarray(names_band)
+        # The last pixel column stays black as the right outline
+        strip[:, NAME_WIDTH:width - 1] = render_cells(block, sprites)
+        yield strip
+
+    # Bottom outline under the cells
+    closing = np.zeros((1, width, 3), dtype=np.uint8)
+    closing[:, :NAME_WIDTH] = 255
+    yield closing
+
+
+def _render_page(job):
+    """
+    Renders one page, with the names and header, and writes it to its file strip by strip.
+
+    Args:
+        job (tuple): (path, codes, names, table, header, cell_size).
+
+    Returns:
+        str: The written path.
+    """
+    path, codes, names, table, header, cell_size = job
+    num_rows, num_columns = codes.shape
+    width = NAME_WIDTH + num_columns * cell_size + 1
+    # One row of cells is left above the alignment for the header
+    height = (num_rows + 1) * cell_size + 1
+    _write_png(path, width, height, _page_strips(codes, names, table, header, cell_size))
+    return path
+
+
+def _default_workers():
+    """
+    Number of rendering processes that fit in the free memory, at most one per CPU.
+    """
+    cpus = os.cpu_count() or 1
+    try:
+        available = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        # The free memory is unknown (e.g. on Windows), so only a few processes are started
+        return min(cpus, 4)
+    return max(min(cpus, available // WORKER_MEMORY), 1)
+
+
+def export_png(path, alignment, colors, header=(), cell_size=CELL_SIZE, page_columns=PAGE_COLUMNS,
+               page_rows=PAGE_ROWS, workers=None):
+    """
+    Saves an alignment as colored PNG images.
+
+    Alignments larger than one page are split into pages of at most page_rows x page_columns
+    cells, written as path with _1, _2, ... before the extension, rows of pages first. The
+    page size is reduced further where a page would exceed MAX_PAGE_PIXELS. Pages are
+    rendered in parallel processes. Nothing is written outside these paths.
+
+    Args:
+        path (str): Output path chosen by the user.
+        alignment (Alignment): Alignment to draw.
+        colors (list): Color per byte code, as returned by alignment_viewer.load_colors.
+        header (list): Texts written in the line above the alignment on every page.
+        cell_size (int): Side of one cell in pixels.
+        page_columns (int): Largest number of alignment columns on one page.
+        page_rows (int): Largest number of sequences on one page.
+        workers (int): Number of processes rendering pages. Defaults to as many as fit in the
+            free memory, at most one per CPU.
+
+    Returns:
+        list: Paths of the written files.
+    """
+    table = color_table(colors)
+    page_rows, page_columns = page_shape(cell_size, page_rows, page_columns)
+    num_rows, num_columns = alignment.rows.shape
+    blocks = [(row, column) for row in range(0, max(num_rows, 1), page_rows)
+              for column in range(0, max(num_columns, 1), page_columns)]
+
+    stem, extension = os.path.splitext(path)
+    jobs = []
+    for number, (row, column) in enumerate(blocks, 1):
+        page_path = path if len(blocks) == 1 else f"{stem}_{number}{extension or '.png'}"
+        page_header = list(header)
+        if num_rows > page_rows:
+            page_header.append(f"Sequences {row + 1}-{min(row + page_rows, num_rows)}")
+        if num_columns > page_columns:
+            page_header.append(f"Columns {column + 1}-{min(column + page_columns, num_columns)}")
+        jobs.append((page_path, alignment.rows[row:row + page_rows, column:column + page_columns],
+                     alignment.names[row:row + page_rows], table, page_header, cell_size))
+
+    workers = min(workers or _default_workers(), len(jobs))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_render_page, jobs))
+
+    return [_render_page(job) for job in jobs]
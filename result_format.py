@@ -0,0 +1,140 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from alignment import Alignment
+
+# First bytes of every result file, with the format version
+MAGIC = b"MSARES01"
+# Arrays start on multiples of this many bytes, so they can be mapped and vectorized as they are
+ALIGNMENT = 64
+# Suffix of result files
+RESULT_SUFFIX = ".msar"
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class AlignmentResult:
+    """
+        A finished alignment with everything needed to show, export or rescore it without
+        realigning, stored in a memory-mappable file.
+
+        The file is MAGIC, the length of a JSON header as a little-endian uint64, the header,
+        and the arrays it describes, each starting at a multiple of ALIGNMENT bytes.
+    """
+    def __init__(self, alignment, pairwise_scores=None, center_index=None, score=None, statistics=None,
+                 parameters=None):
+        """
+        Args:
+            alignment (Alignment): Final aligned sequences.
+            pairwise_scores (numpy.ndarray): N x N pairwise score matrix, in input order.
+            center_index (int): Input index of the central sequence.
+            score (int): Sum-of-pairs score of the alignment.
+            statistics (dict): Statistics of the alignment.
+            parameters (dict): Parameters the alignment was computed with.
+        """
+        self.alignment = alignment
+        self.pairwise_scores = pairwise_scores
+        self.center_index = center_index
+        self.score = score
+        self.statistics = statistics or {}
+        self.parameters = parameters or {}
+
+    @classmethod
+    def from_aligner(cls, msa, parameters=None):
+        """
+        Collects the results of a MultipleSequenceAligner, running its remaining stages.
+
+        Args:
+            msa (MultipleSequenceAligner): The aligner.
+            parameters (dict): Parameters to store with the result.
+
+        Returns:
+            AlignmentResult: The result.
+        """
+        return cls(msa.get_final_alignments(), msa.get_pairwise_scores(), msa.center_index, msa.get_score(),
+                   msa.get_statistics(), parameters)
+
+    def save(self, path):
+        """
+        Writes the result file. It is written next to path and moved over it when complete,
+        so a result loaded from path stays valid while it is replaced.
+
+        Args:
+            path (str): Output path.
+        """
+        arrays = {"rows": self.alignment.rows}
+        if self.pairwise_scores is not None:
+            arrays["pairwise_scores"] = self.pairwise_scores
+
+        layout = {}
+        offset = 0
+        for name, array in arrays.items():
+            layout[name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+            offset = _aligned(offset + array.nbytes)
+
+        header = json.dumps({
+            "names": self.alignment.names,
+            "center_index": None if self.center_index is None else int(self.center_index),
+            "score": None if self.score is None else int(self.score),
+            "statistics": self.statistics,
+            "parameters": self.parameters,
+            "arrays": layout,
+        }).encode("utf-8")
+        data_start = _aligned(len(MAGIC) + 8 + len(header))
+
+        temporary = path + ".tmp"
+        try:
+            with open(temporary, "wb") as file:
+                file.write(MAGIC + struct.pack("<Q", len(header)) + header)
+                for name, array in arrays.items():
+                    file.write(b"\0" * (data_start + layout[name]["offset"] - file.tell()))
+                    file.write(np.ascontiguousarray(array).reshape(-1).view(np.uint8).data)
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """
+        Opens a result file. The arrays are memory-mapped read-only, so only the header is
+        read up front and the rows are paged in as they are used.
+
+        Args:
+            path (str): Path of a file written by save.
+
+        Returns:
+            AlignmentResult: The result, its alignment backed by the file.
+
+        Raises:
+            ValueError: If the file is not a complete result file.
+        """
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an alignment result file")
+            try:
+                header_length, = struct.unpack("<Q", file.read(8))
+                header = json.loads(file.read(header_length).decode("utf-8"))
+                data_start = _aligned(len(MAGIC) + 8 + header_length)
+
+                arrays = {}
+                for name, entry in header["arrays"].items():
+                    shape = tuple(entry["shape"])
+                    if 0 in shape:
+                        # An empty array cannot be mapped
+                        arrays[name] = np.zeros(shape, dtype=entry["dtype"])
+                    else:
+                        arrays[name] = np.memmap(path, dtype=entry["dtype"], mode="r",
+                                                 offset=data_start + entry["offset"], shape=shape)
+
+                return cls(Alignment(header["names"], arrays["rows"]), arrays.get("pairwise_scores"),
+                           header["center_index"], header["score"], header["statistics"], header["parameters"])
+            except (struct.error, KeyError, TypeError, AttributeError, ValueError) as error:
+                # Truncated files and headers with missing or malformed fields
+                raise ValueError(f"{path} is not a valid {RESULT_SUFFIX} file") from error
@@ -0,0 +1,286 @@
+import hashlib
+import sqlite3
+import time
+
+import numpy as np
+
+# Default size limit of the cache file contents
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Approximate bookkeeping cost of one row, added to the stored text
+_ROW_OVERHEAD = 100
+
+# Number of hits whose recency is collected before it is written
+TOUCH_BATCH = 1000
+
+
+def sequence_digest(sequence):
+    """
+    Hashes a sequence string.
+
+    Returns:
+        str: Hex SHA-256 digest of the sequence.
+    """
+    return hashlib.sha256(sequence.encode("ascii")).hexdigest()
+
+
+class PairwiseScoreCache:
+    """
+        A persistent SQLite store of pairwise scores and alignments shared between runs and processes.
+    """
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Opens (or creates) the cache file.
+
+        Entries are keyed by the hashes of both sequences and the scoring parameters. When the
+        stored entries exceed max_bytes the least recently used ones are evicted; their total
+        size is kept in a one-row table updated with every write, so it is never summed. The
+        database runs in WAL mode with a busy timeout and writes take the write lock up front,
+        so several processes can use the same file at once. Lookups do not write: the recency
+        of hits is collected and stored with the next insert, every TOUCH_BATCH hits or on
+        close, and dropped if the file is busy.
+
+        Args:
+            path (str): Path of the SQLite file.
+            max_bytes (int): Size limit of the stored entries.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, score INTEGER, align1 TEXT, align2 TEXT, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)")
+        self.__connection.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), size INTEGER NOT NULL)")
+        # Files written before the totals table existed are summed once
+        self.__write(lambda: self.__connection.execute(
+            "INSERT OR IGNORE INTO totals (id, size) SELECT 0, COALESCE(SUM(size), 0) FROM entries"))
+        # Key -> time of its last hit, not yet written
+        self.__touched = {}
+
+    @staticmethod
+    def score_key(first_seq, second_seq, scoring):
+        """
+        Builds the key of a pairwise score. Scores are symmetric, so the pair is unordered.
+
+        Args:
+            first_seq (str): First sequence.
+            second_seq (str): Second sequence.
+            scoring (tuple): Scoring parameters, e.g. (substitution matrix key, gap_penalty).
+
+        Returns:
+            str: Cache key.
+        """
+        return PairwiseScoreCache.score_key_from_digests(sequence_digest(first_seq), sequence_digest(second_seq),
+                                                         scoring)
+
+    @staticmethod
+    def score_key_from_digests(first_digest, second_digest, scoring):
+        """
+        Builds the key of a pairwise score from sequence digests, so callers keying many pairs
+        hash each sequence only once.
+
+        Args:
+            first_digest (str): sequence_digest of the first sequence.
+            second_digest (str): sequence_digest of the second sequence.
+            scoring (tuple): Scoring parameters, as in score_key.
+
+        Returns:
+            str: Cache key, equal to score_key of the two sequences.
+        """
+        return PairwiseScoreCache.__key("score", sorted((first_digest, second_digest)), scoring)
+
+    @staticmethod
+    def alignment_key(first_seq, second_seq, scoring):
+        """
+        Builds the key of a pairwise alignment. Tie-breaking depends on which sequence is along
+        the rows, so the pair is ordered.
+
+        Returns:
+            str: Cache key.
+        """
+        digests = (sequence_digest(first_seq), sequence_digest(second_seq))
+        return PairwiseScoreCache.__key("alignment", digests, scoring)
+
+    @staticmethod
+    def __key(kind, digests, scoring):
+        text = "|".join([kind, *digests, *(str(parameter) for parameter in scoring)])
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_scores(self, keys):
+        """
+        Looks up several scores at once.
+
+        Args:
+            keys (list): Keys from score_key.
+
+        Returns:
+            dict: key -> score for the keys found.
+        """
+        found = {}
+        for row in self.__select("score", keys):
+            found[row[0]] = row[1]
+        self.__record_lookups(len(keys), found)
+        return found
+
+    def put_scores(self, entries):
+        """
+        Stores several scores at once.
+
+        Args:
+            entries (dict): key -> score.
+        """
+        self.__insert([(key, score, None, None, _ROW_OVERHEAD) for key, score in entries.items()])
+
+    def get_alignment(self, key):
+        """
+        Looks up a pairwise alignment.
+
+        Args:
+            key (str): Key from alignment_key.
+
+        Returns:
+            tuple: Two uint8 arrays of aligned byte codes (align1, align2), or None on a miss.
+        """
+        rows = self.__select("align1, align2", [key])
+        found = {row[0]: (np.frombuffer(row[1].encode("ascii"), dtype=np.uint8),
+                          np.frombuffer(row[2].encode("ascii"), dtype=np.uint8)) for row in rows}
+        self.__record_lookups(1, found)
+        return found.get(key)
+
+    def put_alignment(self, key, align1, align2):
+        """
+        Stores a pairwise alignment.
+
+        Args:
+            key (str): Key from alignment_key.
+            align1 (numpy.ndarray): Aligned byte codes of the first sequence.
+            align2 (numpy.ndarray): Aligned byte codes of the second sequence.
+        """
+        size = _ROW_OVERHEAD + len(align1) + len(align2)
+        self.__insert([(key, None, align1.tobytes().decode("ascii"), align2.tobytes().decode("ascii"), size)])
+
+    def statistics(self):
+        """
+        Gets the hit and miss counters of this process and the size of the store.
+
+        Returns:
+            dict: hits, misses, entries and bytes.
+        """
+        entries, = self.__connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": self.__total()}
+
+    def close(self):
+        """
+        Writes the recency of pending hits, if the file is not busy, and closes the connection.
+        """
+        self.__flush_touches()
+        self.__connection.close()
+
+    def __select(self, columns, keys):
+        rows = []
+        # SQLite limits the number of bound parameters per statement
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(self.__connection.execute(
+                f"SELECT key, {columns} FROM entries WHERE key IN ({placeholders})", chunk).fetchall())
+        if rows:
+            now = time.time()
+            self.__touched.update((row[0], now) for row in rows)
+            if len(self.__touched) >= TOUCH_BATCH:
+                self.__flush_touches()
+        return rows
+
+    def __record_lookups(self, requested, found):
+        self.hits += len(found)
+        self.misses += requested - len(found)
+
+    def __total(self):
+        return self.__connection.execute("SELECT size FROM totals WHERE id = 0").fetchone()[0]
+
+    def __write_touches(self):
+        """
+        Stores the recency of pending hits; runs inside a write transaction.
+        """
+        if self.__touched:
+            self.__connection.executemany("UPDATE entries SET last_used = ? WHERE key = ?",
+                                          [(stamp, key) for key, stamp in self.__touched.items()])
+            self.__touched = {}
+
+    def __flush_touches(self):
+        """
+        Stores the recency of pending hits on its own. Recency only steers eviction, so the
+        stamps are dropped rather than waited for when another process holds the write lock.
+        """
+        if not self.__touched:
+            return
+        try:
+            self.__connection.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            self.__touched = {}
+            return
+        try:
+            self.__write_touches()
+        except BaseException:
+            self.__connection.execute("ROLLBACK")
+            raise
+        self.__connection.execute("COMMIT")
+
+    def __insert(self, rows):
+        now = time.time()
+
+        def insert():
+            self.__write_touches()
+            keys = [row[0] for row in rows]
+            # Replaced entries no longer count towards the total
+            replaced = 0
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                replaced += self.__connection.execute(
+                    f"SELECT COALESCE(SUM(size), 0) FROM entries WHERE key IN ({placeholders})", chunk).fetchone()[0]
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO entries (key, score, align1, align2, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)", [(*row, now) for row in rows])
+            added = sum(row[4] for row in rows) - replaced
+            self.__connection.execute("UPDATE totals SET size = size + ? WHERE id = 0", (added,))
+            self.__evict()
+
+        self.__write(insert)
+
+    def __evict(self):
+        """
+        Deletes least recently used entries until the store fits into max_bytes.
+        """
+        total = self.__total()
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self.__connection.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self.__connection.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.__connection.execute("UPDATE totals SET size = size - ? WHERE id = 0", (freed,))
+
+    def __write(self, operation):
+        """
+        Runs operation in a transaction holding the write lock from the start.
+        """
+        self.__connection.execute("BEGIN IMMEDIATE")
+        try:
+            operation()
+        except BaseException:
+            self.__connection.execute("ROLLBACK")
+            raise
+        self.__connection.execute("COMMIT")
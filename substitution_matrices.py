@@ -0,0 +1,213 @@
+import hashlib
+import os
+
+import numpy as np
+
+from pairwise_alignment import encode_sequence
+
+
+class SubstitutionMatrix:
+    """
+        A symmetric table of pair scores over an alphabet, applied to byte-encoded sequences.
+    """
+    def __init__(self, alphabet, scores, name="custom"):
+        """
+        Builds the score table and the byte -> code lookup.
+
+        Args:
+            alphabet (str): Symbols of the table rows and columns. Lowercase letters are scored
+                like their uppercase symbol. None uses every byte value as its own symbol.
+            scores (array_like): |alphabet| x |alphabet| symmetric integer scores.
+            name (str): Name shown to users and used in cache keys.
+        """
+        table = np.asarray(scores, dtype=np.int64)
+        size = 256 if alphabet is None else len(alphabet)
+        if table.shape != (size, size):
+            raise ValueError(f"Substitution matrix {name} must be {size} x {size}, got {table.shape}")
+        if not np.array_equal(table, table.T):
+            raise ValueError(f"Substitution matrix {name} is not symmetric")
+
+        lookup = np.full(256, -1, dtype=np.int16)
+        if alphabet is None:
+            lookup[:] = np.arange(256)
+        else:
+            for code, symbol in enumerate(alphabet):
+                lookup[ord(symbol)] = code
+            for code, symbol in enumerate(alphabet):
+                if lookup[ord(symbol.lower())] < 0:
+                    lookup[ord(symbol.lower())] = code
+
+        self.name = name
+        self.alphabet = alphabet
+        self.table = table
+        self.__lookup = lookup
+
+    @classmethod
+    def flat(cls, match_score, mismatch_score):
+        """
+        Builds the table of plain match/mismatch scoring over all byte values.
+
+        Returns:
+            SubstitutionMatrix: match_score on the diagonal, mismatch_score elsewhere.
+        """
+        return cls(None, np.where(np.eye(256, dtype=bool), match_score, mismatch_score),
+                   f"match {match_score}, mismatch {mismatch_score}")
+
+    @classmethod
+    def parse(cls, text, name="custom"):
+        """
+        Reads a matrix in the NCBI text format: a header line with the column symbols, then one
+        line per row starting with its symbol. Lines starting with "#" are comments.
+
+        Args:
+            text (str): Matrix text.
+            name (str): Name of the matrix.
+
+        Returns:
+            SubstitutionMatrix: The parsed matrix.
+        """
+        lines = [line.split() for line in text.splitlines() if line.strip() and not line.startswith("#")]
+        alphabet = "".join(lines[0])
+        rows = {line[0]: [int(value) for value in line[1:]] for line in lines[1:]}
+        if sorted(rows) != sorted(alphabet):
+            raise ValueError(f"Row symbols of substitution matrix {name} do not match its columns")
+
+        return cls(alphabet, [rows[symbol] for symbol in alphabet], name)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a matrix file in the NCBI text format, named after the file.
+
+        Returns:
+            SubstitutionMatrix: The parsed matrix.
+        """
+        with open(path) as file:
+            return cls.parse(file.read(), os.path.basename(path))
+
+    @property
+    def max_score(self):
+        """
+        int: Highest score of any pair.
+        """
+        return int(self.table.max())
+
+    @property
+    def key(self):
+        """
+        str: Digest of the alphabet and scores, for cache keys.
+        """
+        digest = hashlib.sha256(self.__lookup.tobytes() + self.table.tobytes()).hexdigest()
+        return f"{self.name}:{digest}"
+
+    def encode(self, sequence):
+        """
+        Encodes a sequence into table indices with one lookup.
+
+        Args:
+            sequence (str or numpy.ndarray): Sequence string or its byte codes.
+
+        Returns:
+            numpy.ndarray: Row of the table for every residue.
+        """
+        codes = self.__lookup[encode_sequence(sequence)]
+        unknown = np.flatnonzero(codes < 0)
+        if len(unknown):
+            residue = chr(encode_sequence(sequence)[unknown[0]])
+            raise ValueError(f"Residue {residue!r} is not in the alphabet of substitution matrix {self.name}")
+        return codes
+
+    def profile(self, first, second):
+        """
+        Gathers one row of pair scores for every distinct residue of the first sequence.
+
+        Args:
+            first (numpy.ndarray): Encoded first sequence.
+            second (numpy.ndarray): Encoded second sequence.
+
+        Returns:
+            tuple: (profile, first_index) - profile[first_index[i]] scores first[i] against second.
+        """
+        symbols, first_index = np.unique(first, return_inverse=True)
+        return self.table[symbols[:, None], second], first_index
+
+
+BLOSUM62 = SubstitutionMatrix.parse("""
+   A  R  N  D  C  Q  E  G  H  I  L  K  M  F  P  S  T  W  Y  V  B  Z  X  *
+A  4 -1 -2 -2  0 -1 -1  0 -2 -1 -1 -1 -1 -2 -1  1  0 -3 -2  0 -2 -1  0 -4
+R -1  5  0 -2 -3  1  0 -2  0 -3 -2  2 -1 -3 -2 -1 -1 -3 -2 -3 -1  0 -1 -4
+N -2  0  6  1 -3  0  0  0  1 -3 -3  0 -2 -3 -2  1  0 -4 -2 -3  3  0 -1 -4
+D -2 -2  1  6 -3  0  2 -1 -1 -3 -4 -1 -3 -3 -1  0 -1 -4 -3 -3  4  1 -1 -4
+C  0 -3 -3 -3  9 -3 -4 -3 -3 -1 -1 -3 -1 -2 -3 -1 -1 -2 -2 -1 -3 -3 -2 -4
+Q -1  1  0  0 -3  5  2 -2  0 -3 -2  1  0 -3 -1  0 -1 -2 -1 -2  0  3 -1 -4
+E -1  0  0  2 -4  2  5 -2  0 -3 -3  1 -2 -3 -1  0 -1 -3 -2 -2  1  4 -1 -4
+G  0 -2  0 -1 -3 -2 -2  6 -2 -4 -4 -2 -3 -3 -2  0 -2 -2 -3 -3 -1 -2 -1 -4
+H -2  0  1 -1 -3  0  0 -2  8 -3 -3 -1 -2 -1 -2 -1 -2 -2  2 -3  0  0 -1 -4
+I -1 -3 -3 -3 -1 -3 -3 -4 -3  4  2 -3  1  0 -3 -2 -1 -3 -1  3 -3 -3 -1 -4
+L -1 -2 -3 -4 -1 -2 -3 -4 -3  2  4 -2  2  0 -3 -2 -1 -2 -1  1 -4 -3 -1 -4
+K -1  2  0 -1 -3  1  1 -2 -1 -3 -2  5 -1 -3 -1  0 -1 -3 -2 -2  0  1 -1 -4
+M -1 -1 -2 -3 -1  0 -2 -3 -2  1  2 -1  5  0 -2 -1 -1 -1 -1  1 -3 -1 -1 -4
+F -2 -3 -3 -3 -2 -3 -3 -3 -1  0  0 -3  0  6 -4 -2 -2  1  3 -1 -3 -3 -1 -4
+P -1 -2 -2 -1 -3 -1 -1 -2 -2 -3 -3 -1 -2 -4  7 -1 -1 -4 -3 -2 -2 -1 -2 -4
+S  1 -1  1  0 -1  0  0  0 -1 -2 -2  0 -1 -2 -1  4  1 -3 -2 -2  0  0  0 -4
+T  0 -1  0 -1 -1 -1 -1 -2 -2 -1 -1 -1 -1 -2 -1  1  5 -2 -2  0 -1 -1  0 -4
+W -3 -3 -4 -4 -2 -2 -3 -2 -2 -3 -2 -3 -1  1 -4 -3 -2 11  2 -3 -4 -3 -2 -4
+Y -2 -2 -2 -3 -2 -1 -2 -3  2 -1 -1 -2 -1  3 -3 -2 -2  2  7 -1 -3 -2 -1 -4
+V  0 -3 -3 -3 -1 -2 -2 -3 -3  3  1 -2  1 -1 -2 -2  0 -3 -1  4 -3 -2 -1 -4
+B -2 -1  3  4 -3  0  1 -1  0 -3 -4  0 -3 -3 -2  0 -1 -4 -3 -3  4  1 -1 -4
+Z -1  0  0  1 -3  3  4 -2  0 -3 -3  1 -1 -3 -1  0 -1 -3 -2 -2  1  4 -1 -4
+X  0 -1 -1 -1 -2 -1 -1 -1 -1 -1 -1 -1 -1 -1 -2  0  0 -2 -1 -1 -1 -1 -1 -4
+* -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4  1
+""", "BLOSUM62")
+
+PAM250 = SubstitutionMatrix.parse("""
+   A  R  N  D  C  Q  E  G  H  I  L  K  M  F  P  S  T  W  Y  V  B  Z  X  *
+A  2 -2  0  0 -2  0  0  1 -1 -1 -2 -1 -1 -3  1  1  1 -6 -3  0  0  0  0 -8
+R -2  6  0 -1 -4  1 -1 -3  2 -2 -3  3  0 -4  0  0 -1  2 -4 -2 -1  0 -1 -8
+N  0  0  2  2 -4  1  1  0  2 -2 -3  1 -2 -3  0  1  0 -4 -2 -2  2  1  0 -8
+D  0 -1  2  4 -5  2  3  1  1 -2 -4  0 -3 -6 -1  0  0 -7 -4 -2  3  3 -1 -8
+C -2 -4 -4 -5 12 -5 -5 -3 -3 -2 -6 -5 -5 -4 -3  0 -2 -8  0 -2 -4 -5 -3 -8
+Q  0  1  1  2 -5  4  2 -1  3 -2 -2  1 -1 -5  0 -1 -1 -5 -4 -2  1  3 -1 -8
+E  0 -1  1  3 -5  2  4  0  1 -2 -3  0 -2 -5 -1  0  0 -7 -4 -2  3  3 -1 -8
+G  1 -3  0  1 -3 -1  0  5 -2 -3 -4 -2 -3 -5  0  1  0 -7 -5 -1  0  0 -1 -8
+H -1  2  2  1 -3  3  1 -2  6 -2 -2  0 -2 -2  0 -1 -1 -3  0 -2  1  2 -1 -8
+I -1 -2 -2 -2 -2 -2 -2 -3 -2  5  2 -2  2  1 -2 -1  0 -5 -1  4 -2 -2 -1 -8
+L -2 -3 -3 -4 -6 -2 -3 -4 -2  2  6 -3  4  2 -3 -3 -2 -2 -1  2 -3 -3 -1 -8
+K -1  3  1  0 -5  1  0 -2  0 -2 -3  5  0 -5 -1  0  0 -3 -4 -2  1  0 -1 -8
+M -1  0 -2 -3 -5 -1 -2 -3 -2  2  4  0  6  0 -2 -2 -1 -4 -2  2 -2 -2 -1 -8
+F -3 -4 -3 -6 -4 -5 -5 -5 -2  1  2 -5  0  9 -5 -3 -3  0  7 -1 -4 -5 -2 -8
+P  1  0  0 -1 -3  0 -1  0  0 -2 -3 -1 -2 -5  6  1  0 -6 -5 -1 -1  0 -1 -8
+S  1  0  1  0  0 -1  0  1 -1 -1 -3  0 -2 -3  1  2  1 -2 -3 -1  0  0  0 -8
+T  1 -1  0  0 -2 -1  0  0 -1  0 -2  0 -1 -3  0  1  3 -5 -3  0  0 -1  0 -8
+W -6  2 -4 -7 -8 -5 -7 -7 -3 -5 -2 -3 -4  0 -6 -2 -5 17  0 -6 -5 -6 -4 -8
+Y -3 -4 -2 -4  0 -4 -4 -5  0 -1 -1 -4 -2  7 -5 -3 -3  0 10 -2 -3 -4 -2 -8
+V  0 -2 -2 -2 -2 -2 -2 -1 -2  4  2 -2  2 -1 -1 -1  0 -6 -2  4 -2 -2 -1 -8
+B  0 -1  2  3 -4  1  3  0  1 -2 -3  1 -2 -4 -1  0  0 -5 -3 -2  3  2 -1 -8
+Z  0  0  1  3 -5  3  3  0  2 -2 -3  0 -2 -5  0  0 -1 -6 -4 -2  2  3 -1 -8
+X  0 -1  0 -1 -3 -1 -1 -1 -1 -1 -1 -1 -1 -2 -1  0  0 -4 -2 -1 -1 -1 -1 -8
+* -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8  1
+""", "PAM250")
+
+# Built-in matrices by name
+MATRICES = {matrix.name: matrix for matrix in (BLOSUM62, PAM250)}
+
+
+def get_matrix(matrix):
+    """
+    Resolves a substitution matrix given by name, by file path or as an object.
+
+    Args:
+        matrix (str or SubstitutionMatrix): Built-in name (case-insensitive), path of a matrix
+            file in the NCBI text format, or a matrix.
+
+    Returns:
+        SubstitutionMatrix: The matrix.
+    """
+    if isinstance(matrix, SubstitutionMatrix):
+        return matrix
+    if matrix.upper() in MATRICES:
+        return MATRICES[matrix.upper()]
+    if os.path.isfile(matrix):
+        return SubstitutionMatrix.load(matrix)
+
+    raise ValueError(f"Unknown substitution matrix {matrix!r}, expected a file or one of {tuple(MATRICES)}")